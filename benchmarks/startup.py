@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+启动耗时测试
+多次以 -X importtime 启动 main.py，统计到第一帧绘制完成的耗时和最慢的导入模块，
+并检查第一帧之前是否加载了应当延迟导入的模块
+
+用法:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --budget-ms 800
+
+需要图形显示环境（Linux 服务器上可以使用 xvfb-run）。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 第一帧之前不应加载的模块：只在使用相应功能时才需要
+DEFERRED_MODULES = ["requests", "pypinyin", "genai", "ui.genai_config_window"]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str]]:
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        List[Tuple[int, str]]: (累计耗时微秒, 模块名) 列表
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            # 表头行
+            continue
+        # 模块名前的缩进表示嵌套层级，顶层模块只有一个空格
+        imports.append((cumulative, parts[2][1:].rstrip()))
+    return imports
+
+
+def run_once() -> Dict:
+    """启动一次 main.py，返回第一帧耗时、总耗时、导入统计和已加载模块"""
+    env = dict(os.environ, MUSIC_MANAGER_STARTUP_BENCHMARK="1")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    report = None
+    for line in process.stdout.splitlines():
+        try:
+            report = json.loads(line)
+        except ValueError:
+            continue
+
+    if report is None:
+        raise RuntimeError(f"main.py 没有输出启动耗时（退出码 {process.returncode}）:\n{process.stderr[-2000:]}")
+
+    report["wall_ms"] = wall_ms
+    report["imports"] = parse_importtime(process.stderr)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="测试 main.py 到第一帧绘制完成的启动耗时")
+    parser.add_argument("--runs", type=int, default=5, help="启动次数（取中位数）")
+    parser.add_argument("--top", type=int, default=15, help="显示累计耗时最长的导入模块数量")
+    parser.add_argument("--budget-ms", type=float, default=None, help="第一帧耗时预算，超出时返回非零退出码")
+    args = parser.parse_args()
+
+    reports = [run_once() for _ in range(max(1, args.runs))]
+    first_frame = statistics.median(report["first_frame_ms"] for report in reports)
+    wall = statistics.median(report["wall_ms"] for report in reports)
+
+    print(f"启动次数: {len(reports)}")
+    print(f"第一帧耗时（中位数，不含解释器启动）: {first_frame:.1f} ms")
+    print(f"进程总耗时（中位数，含退出）: {wall:.1f} ms")
+
+    # 导入耗时以最后一次为准（前几次用于预热文件系统缓存）
+    imports = reports[-1]["imports"]
+    top_level = [item for item in imports if not item[1].startswith(" ")]
+    print(f"顶层导入累计耗时: {sum(cumulative for cumulative, _ in top_level) / 1000:.1f} ms")
+    print(f"累计耗时最长的 {args.top} 个导入:")
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+
+    failed = False
+    loaded = set(reports[-1]["loaded_modules"])
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    if eager:
+        print(f"第一帧之前加载了应当延迟导入的模块: {', '.join(eager)}")
+        failed = True
+
+    if args.budget_ms is not None and first_frame > args.budget_ms:
+        print(f"第一帧耗时超出预算 {args.budget_ms:.0f} ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
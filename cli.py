@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+音频文件管理器 - 命令行入口
+无需图形界面即可分析和重命名音频文件，结果以 JSON Lines 格式输出到标准输出，
+适合在无显示环境的服务器上运行批处理任务
+
+用法示例:
+    python cli.py analyze /path/to/album
+    python cli.py rename /path/to/album            # 仅显示重命名计划
+    python cli.py rename /path/to/album --apply    # 执行重命名
+    python cli.py rename /path/to/library --recursive --apply
+    python cli.py undo /path/to/album
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+# 注意：本文件不能导入 tkinter/customtkinter；genai、requests、pypinyin 只在需要时加载
+from core.audio_manager import AudioFileManager
+from core.library import LibraryAnalyzer, LibraryReport
+from core.linux_rename import is_supported as renameat2_supported
+
+SORT_METHODS = [
+    "LLM建议 (A-Z)",
+    "LLM建议 (Z-A)",
+    "文件名称 (A-Z)",
+    "文件名称 (Z-A)",
+    "文件大小 (小到大)",
+    "文件大小 (大到小)"
+]
+
+NUMBERING_METHODS = {
+    "sequential": AudioFileManager.NUMBERING_SEQUENTIAL,
+    "minimal": AudioFileManager.NUMBERING_MINIMAL
+}
+
+
+def emit(record: Dict):
+    """输出一条 JSON Lines 记录"""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def create_progress_callback(enabled: bool):
+    """创建把进度写到标准错误的回调，未启用时返回None"""
+    if not enabled:
+        return None
+
+    def progress_callback(progress, message):
+        sys.stderr.write(json.dumps({"type": "progress", "progress": progress, "message": message},
+                                    ensure_ascii=False) + "\n")
+        sys.stderr.flush()
+
+    return progress_callback
+
+
+def emit_analysis(folder_path: str, analysis: Dict):
+    """输出单个文件夹的分析结果"""
+    for file_info in analysis['files']:
+        emit({
+            "type": "file",
+            "folder": folder_path,
+            "original_name": file_info['original_name'],
+            "suggested_name": file_info['suggested_name'],
+            "status": file_info['status'],
+            "needs_rename": file_info['original_name'] != file_info['suggested_name']
+        })
+
+    emit({
+        "type": "folder_summary",
+        "folder": folder_path,
+        "total_files": analysis['total_files'],
+        "needs_rename_count": analysis['needs_rename_count'],
+        "needs_renaming": analysis['needs_renaming'],
+        "has_gaps": analysis['has_gaps'],
+        "duplicate_numbers": analysis['duplicate_numbers']
+    })
+
+
+def emit_library_summary(report: LibraryReport):
+    """输出音乐库汇总结果"""
+    for error in report.errors:
+        emit({"type": "error", "message": error})
+
+    emit({
+        "type": "library_summary",
+        "root": report.root_path,
+        "folder_count": report.folder_count,
+        "total_files": report.total_files,
+        "needs_rename_count": report.needs_rename_count,
+        "folders_needing_rename": len(report.folders_needing_rename)
+    })
+
+
+def analyze(manager: AudioFileManager, args) -> Dict[str, Dict]:
+    """
+    分析文件夹（或递归分析音乐库），输出分析结果
+
+    Returns:
+        Dict[str, Dict]: 文件夹路径 -> 分析结果
+    """
+    progress_callback = create_progress_callback(args.progress)
+    numbering = NUMBERING_METHODS[args.numbering]
+
+    if not args.recursive:
+        analysis = manager.analyze_files(args.path, args.sort, progress_callback, numbering)
+        emit_analysis(args.path, analysis)
+        emit_metadata_latency(manager)
+        return {args.path: analysis}
+
+    library = LibraryAnalyzer(manager, max_workers=args.workers)
+    report = library.analyze_library(args.path, args.sort, progress_callback, numbering)
+    for folder in report.folders:
+        if folder.folder_path in report.results:
+            emit_analysis(folder.folder_path, report.results[folder.folder_path])
+    emit_library_summary(report)
+    emit_metadata_latency(manager)
+    return report.results
+
+
+def emit_metadata_latency(manager: AudioFileManager):
+    """输出读取文件元数据的耗时统计，用于为网络挂载选择合适的并发数"""
+    for stats in manager.get_metadata_latency():
+        emit(dict({"type": "metadata_latency"}, **stats))
+
+
+def command_analyze(manager: AudioFileManager, args) -> int:
+    """analyze 子命令"""
+    analyze(manager, args)
+    return 0
+
+
+def command_rename(manager: AudioFileManager, args) -> int:
+    """rename 子命令：默认只输出重命名计划，--apply 时执行"""
+    results = analyze(manager, args)
+    has_errors = False
+
+    for folder_path, analysis in results.items():
+        file_mappings = manager.get_rename_mappings(analysis)
+        if not file_mappings:
+            continue
+
+        if not args.apply:
+            # 试运行不触碰文件夹，因此不探测文件系统，只按系统能力预估是否使用交换操作
+            plan = manager.plan_renames(folder_path, file_mappings, use_exchange=renameat2_supported())
+            for operation in plan.operations:
+                emit({
+                    "type": "operation",
+                    "folder": folder_path,
+                    "source": operation.source,
+                    "target": operation.target,
+                    "temp": operation.to_temp,
+                    "exchange": operation.exchange
+                })
+            for conflict in plan.conflicts:
+                emit({"type": "conflict", "folder": folder_path, "message": conflict})
+            emit({
+                "type": "rename_plan",
+                "folder": folder_path,
+                "dry_run": True,
+                "file_count": plan.file_count,
+                "operation_count": len(plan.operations)
+            })
+            has_errors = has_errors or bool(plan.conflicts)
+            continue
+
+        success_count, errors = manager.rename_files(
+            folder_path, file_mappings, create_progress_callback(args.progress)
+        )
+        emit_rename_result(folder_path, success_count, errors)
+        has_errors = has_errors or bool(errors)
+
+    return 1 if has_errors else 0
+
+
+def command_undo(manager: AudioFileManager, args) -> int:
+    """undo 子命令：撤销上一次重命名或回滚被中断的重命名"""
+    success_count, errors = manager.undo_last_rename(args.path, create_progress_callback(args.progress))
+    emit_rename_result(args.path, success_count, errors)
+    return 1 if errors else 0
+
+
+def emit_rename_result(folder_path: str, success_count: int, errors: List[str]):
+    """输出重命名结果"""
+    emit({
+        "type": "rename_result",
+        "folder": folder_path,
+        "success_count": success_count,
+        "errors": errors
+    })
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="音频文件管理器命令行工具（JSON Lines 输出）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("path", help="音频文件夹路径（--recursive 时为音乐库根目录）")
+    common.add_argument("--no-genai", action="store_true", help="不使用GenAI分析文件名")
+    common.add_argument("--progress", action="store_true", help="把进度信息输出到标准错误")
+
+    analysis_options = argparse.ArgumentParser(add_help=False)
+    analysis_options.add_argument("--sort", choices=SORT_METHODS, default="文件名称 (A-Z)", help="排序方式")
+    analysis_options.add_argument("--numbering", choices=sorted(NUMBERING_METHODS), default="sequential",
+                                  help="编号方式：sequential 连续编号，minimal 尽量保留现有编号")
+    analysis_options.add_argument("--recursive", action="store_true",
+                                  help="递归处理根目录下每个包含音频文件的文件夹")
+    analysis_options.add_argument("--workers", type=int, default=LibraryAnalyzer.DEFAULT_MAX_WORKERS,
+                                  help="递归模式下同时处理的文件夹数量")
+    analysis_options.add_argument("--stat-workers", type=int, default=None,
+                                  help="读取文件元数据的并发数（默认: 按 scan_config.json 和挂载类型决定）")
+
+    subparsers.add_parser("analyze", parents=[common, analysis_options], help="分析文件夹")
+
+    rename_parser = subparsers.add_parser("rename", parents=[common, analysis_options], help="重命名文件")
+    rename_parser.add_argument("--apply", action="store_true", help="执行重命名（默认只输出重命名计划）")
+
+    subparsers.add_parser("undo", parents=[common], help="撤销上一次重命名")
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    args = create_parser().parse_args(argv)
+
+    if not os.path.isdir(args.path):
+        emit({"type": "error", "message": f"文件夹不存在: {args.path}"})
+        return 2
+
+    manager = AudioFileManager(enable_genai=not args.no_genai)
+    if getattr(args, "stat_workers", None):
+        manager.metadata_fetcher.max_workers = args.stat_workers
+
+    commands = {
+        "analyze": command_analyze,
+        "rename": command_rename,
+        "undo": command_undo
+    }
+    try:
+        return commands[args.command](manager, args)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,5 +4,6 @@
 """
 
 from .audio_manager import AudioFileManager
+from .library import LibraryAnalyzer, LibraryReport
 
-__all__ = ['AudioFileManager'] 
\ No newline at end of file
+__all__ = ['AudioFileManager', 'LibraryAnalyzer', 'LibraryReport'] 
\ No newline at end of file
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+文件夹分析索引
+使用SQLite持久化每个文件的派生数据，重新分析时只需处理新增或变化的文件
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class AnalysisIndex:
+    """按文件夹保存文件分析结果的磁盘索引"""
+
+    INDEX_FILE = "analysis_index.db"
+
+    def __init__(self, index_path: Optional[str] = None):
+        """
+        初始化分析索引
+
+        Args:
+            index_path: 索引数据库路径（默认: 当前目录下的 analysis_index.db）
+        """
+        self.index_path = Path(index_path) if index_path else Path.cwd() / self.INDEX_FILE
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接（分析在不同的后台线程中执行，每次调用使用独立连接）"""
+        return sqlite3.connect(str(self.index_path))
+
+    def _init_db(self):
+        """创建索引表"""
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    folder TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    inode INTEGER NOT NULL,
+                    clean_name TEXT NOT NULL,
+                    pinyin_key TEXT NOT NULL,
+                    has_prefix INTEGER NOT NULL,
+                    prefix_number INTEGER,
+                    genai_signature TEXT,
+                    genai_analysis TEXT,
+                    PRIMARY KEY (folder, filename)
+                )
+            """)
+
+    @staticmethod
+    def normalize_folder(folder_path: str) -> str:
+        """获取文件夹的规范化路径，作为索引键"""
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def load_folder(self, folder_path: str) -> Dict[str, Dict]:
+        """
+        读取文件夹的全部索引记录
+
+        Args:
+            folder_path: 文件夹路径
+
+        Returns:
+            Dict: 文件名到索引记录的映射
+        """
+        folder = self.normalize_folder(folder_path)
+        records = {}
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT filename, size, mtime, inode, clean_name, pinyin_key, has_prefix, "
+                "prefix_number, genai_signature, genai_analysis FROM files WHERE folder = ?",
+                (folder,)
+            )
+            for row in rows:
+                genai_analysis = None
+                if row[9]:
+                    try:
+                        genai_analysis = json.loads(row[9])
+                    except ValueError:
+                        genai_analysis = None
+
+                records[row[0]] = {
+                    'size': row[1],
+                    'modified_time': row[2],
+                    'inode': row[3],
+                    'clean_name': row[4],
+                    'pinyin_key': row[5],
+                    'has_prefix': bool(row[6]),
+                    'prefix_number': row[7],
+                    'genai_signature': row[8] or '',
+                    'genai_analysis': genai_analysis
+                }
+        finally:
+            conn.close()
+
+        return records
+
+    @staticmethod
+    def is_entry_current(record: Dict, size: int, modified_time: float, inode: int) -> bool:
+        """检查索引记录是否与磁盘上的文件一致"""
+        return (record['size'] == size and
+                record['modified_time'] == modified_time and
+                record['inode'] == inode)
+
+    def update_folder(self, folder_path: str, changed_files: List[Dict],
+                      removed_names: Iterable[str], genai_signature: str = ""):
+        """
+        更新文件夹索引
+
+        Args:
+            folder_path: 文件夹路径
+            changed_files: 新增或变化的文件信息列表（analyze_files 生成的 file_info）
+            removed_names: 已不存在的文件名
+            genai_signature: 当前GenAI配置签名，为空表示没有GenAI结果
+        """
+        folder = self.normalize_folder(folder_path)
+
+        rows = []
+        for file_info in changed_files:
+            genai_analysis = file_info.get('genai_analysis')
+            # 出错的分析结果不写入索引，下次重新分析
+            if not genai_signature or not genai_analysis or 'error' in genai_analysis:
+                genai_json = None
+            else:
+                genai_json = json.dumps(genai_analysis, ensure_ascii=False)
+
+            rows.append((
+                folder,
+                file_info['original_name'],
+                file_info['size'],
+                file_info['modified_time'],
+                file_info['inode'],
+                file_info['clean_name'],
+                file_info['pinyin_key'],
+                1 if file_info['has_prefix'] else 0,
+                file_info.get('prefix_number'),
+                genai_signature if genai_json else None,
+                genai_json
+            ))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM files WHERE folder = ? AND filename = ?",
+                    [(folder, name) for name in removed_names]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        finally:
+            conn.close()
+
+    def clear_folder(self, folder_path: str):
+        """删除文件夹的全部索引记录"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM files WHERE folder = ?", (self.normalize_folder(folder_path),))
+        finally:
+            conn.close()
@@ -6,23 +6,24 @@
 
 import os
 import re
+import threading
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from pypinyin import lazy_pinyin, Style
+from typing import Iterator, List, Dict, Tuple, Optional
 
-# GenAI相关导入
-try:
-    from genai.config import ConfigManager
-    from genai.deepseek_provider import DeepseekProvider
-    from genai.ollama_provider import OllamaProvider
-    from genai.filename_analyzer import FilenameAnalyzer
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-    ConfigManager = None
-    DeepseekProvider = None
-    OllamaProvider = None
-    FilenameAnalyzer = None
+from .scanner import AudioFileEntry, scan_audio_files
+from .metadata_fetcher import MetadataFetcher
+from .tag_reader import read_tags
+from .analysis_index import AnalysisIndex
+from .rename_planner import RenameOperation, RenamePlan, plan_renames
+from .rename_journal import RenameJournal
+from .linux_rename import LinuxRenamer, create_renamer
+from .collation import collation_key, collation_keys
+from .file_record import FileRecord, argsort_numbers
+from utils.progress import ProgressAggregator
+
+# 序号前缀，如 "01-"
+PREFIX_PATTERN = re.compile(r'^(\d+)-')
 
 
 class AudioFileManager:
@@ -33,26 +34,101 @@ class AudioFileManager:
         '.wma', '.opus', '.aiff', '.au', '.ra', '.mp2'
     }
     
-    def __init__(self):
+    # 编号方式
+    NUMBERING_SEQUENTIAL = "连续编号"  # 按排序结果从1开始重新编号
+    NUMBERING_MINIMAL = "最少改动"  # 尽量保留现有编号，只为新文件和顺序冲突的文件分配编号
+    
+    # 降序的排序方式
+    REVERSE_SORT_METHODS = {"LLM建议 (Z-A)", "文件名称 (Z-A)", "文件大小 (大到小)"}
+    
+    def __init__(self, enable_genai: bool = True):
+        """
+        初始化音频文件管理器
+        
+        Args:
+            enable_genai: 是否使用GenAI功能；为False时不导入 genai 模块及其依赖
+        """
         self.current_folder = ""
         self.audio_files = []
         
-        # 初始化GenAI组件
-        self.config_manager = None
-        self.filename_analyzer = None
-        self._init_genai()
+        # 初始化分析索引，失败时退化为每次完整分析
+        self.analysis_index = self._init_analysis_index()
+        
+        # 按挂载点并发读取文件元数据（网络挂载上每次stat都是一次往返）
+        self.metadata_fetcher = MetadataFetcher()
+        
+        # GenAI组件在首次使用时才初始化
+        self.enable_genai = enable_genai
+        self.genai_available = False
+        self._config_manager = None
+        self._filename_analyzer = None
+        self._genai_initialized = not enable_genai
+        self._genai_lock = threading.Lock()
+        
+    def close(self):
+        """退出前提交并关闭LLM结果缓存，并关闭读取元数据的线程池"""
+        if self._filename_analyzer is not None:
+            self._filename_analyzer.close()
+        self.metadata_fetcher.close()
+        
+    def _init_analysis_index(self) -> Optional[AnalysisIndex]:
+        """初始化文件夹分析索引"""
+        try:
+            return AnalysisIndex()
+        except Exception:
+            return None
+        
+    @property
+    def config_manager(self):
+        """GenAI配置管理器（首次访问时初始化GenAI功能）"""
+        self._ensure_genai()
+        return self._config_manager
+    
+    @property
+    def filename_analyzer(self):
+        """文件名分析器（首次访问时初始化GenAI功能）"""
+        self._ensure_genai()
+        return self._filename_analyzer
+    
+    def _ensure_genai(self):
+        """首次使用GenAI功能时才进行初始化，避免启动时导入 genai 模块及其依赖"""
+        if self._genai_initialized:
+            return
+        with self._genai_lock:
+            if not self._genai_initialized:
+                self._init_genai()
+                self._genai_initialized = True
+        
+    def reload_genai(self):
+        """配置修改后重新初始化GenAI功能，并关闭原分析器的结果缓存"""
+        if not self.enable_genai:
+            return
+        with self._genai_lock:
+            if self._filename_analyzer is not None:
+                self._filename_analyzer.close()
+            self._config_manager = None
+            self._filename_analyzer = None
+            self._init_genai()
+            self._genai_initialized = True
         
     def _init_genai(self):
         """初始化GenAI功能"""
-        if not GENAI_AVAILABLE:
+        # GenAI模块依赖 requests 等较重的库，只在需要时导入
+        try:
+            from genai.config import ConfigManager
+            from genai.deepseek_provider import DeepseekProvider
+            from genai.ollama_provider import OllamaProvider
+            from genai.filename_analyzer import FilenameAnalyzer
+        except ImportError:
             return
+        self.genai_available = True
             
         try:
-            self.config_manager = ConfigManager()
+            self._config_manager = ConfigManager()
             
             # 如果GenAI启用，初始化文件名分析器
-            if self.config_manager.is_enabled():
-                provider_info = self.config_manager.get_active_provider_config()
+            if self._config_manager.is_enabled():
+                provider_info = self._config_manager.get_active_provider_config()
                 if provider_info:
                     provider_type = provider_info["provider"]
                     config = provider_info["config"]
@@ -63,34 +139,78 @@ class AudioFileManager:
                             api_key=config.api_key,
                             api_base=config.api_base,
                             model=config.model,
-                            config_manager=self.config_manager
+                            config_manager=self._config_manager
                         )
                     elif provider_type == "ollama":
                         llm_provider = OllamaProvider(
                             api_base=config.api_base,
                             model=config.model,
-                            config_manager=self.config_manager
+                            config_manager=self._config_manager
                         )
                     else:
                         return
                         
-                    self.filename_analyzer = FilenameAnalyzer(llm_provider, self.config_manager)
+                    result_cache = self._create_result_cache()
+                    self._filename_analyzer = FilenameAnalyzer(
+                        llm_provider,
+                        self._config_manager,
+                        result_cache=result_cache,
+                        artist_lexicon=self._create_artist_lexicon(result_cache)
+                    )
                     
         except Exception as e:
             # GenAI初始化失败，继续使用基本功能
-            self.config_manager = None
-            self.filename_analyzer = None
+            self._config_manager = None
+            self._filename_analyzer = None
+            
+    def _create_result_cache(self):
+        """创建LLM结果缓存，未启用或创建失败时返回None"""
+        analysis_config = self._config_manager.config.analysis
+        if not analysis_config.cache_enabled:
+            return None
+            
+        try:
+            from genai.cache import ResultCache
+            return ResultCache(max_entries=analysis_config.cache_max_entries)
+        except Exception:
+            return None
+            
+    def _create_artist_lexicon(self, result_cache):
+        """用缓存中的歌手名和用户歌手列表创建歌手词典，未启用或创建失败时返回None"""
+        analysis_config = self._config_manager.config.analysis
+        if not analysis_config.use_artist_lexicon:
+            return None
+            
+        try:
+            from genai.artist_lexicon import ArtistLexicon
+            artist_list = Path(analysis_config.artist_list_file).expanduser() if analysis_config.artist_list_file else None
+            return ArtistLexicon.from_sources(result_cache, artist_list)
+        except Exception:
+            return None
             
     def is_genai_enabled(self) -> bool:
         """检查GenAI功能是否可用"""
-        return (GENAI_AVAILABLE and 
+        self._ensure_genai()
+        return (self.genai_available and 
                 self.config_manager is not None and 
                 self.config_manager.is_enabled() and
                 self.filename_analyzer is not None)
                 
-    def get_genai_status(self) -> Dict[str, str]:
-        """获取GenAI状态信息"""
-        if not GENAI_AVAILABLE:
+    def get_genai_status(self, use_cache: bool = True) -> Dict[str, str]:
+        """
+        获取GenAI状态信息
+        
+        Args:
+            use_cache: 是否使用缓存的服务可用性检查结果，配置修改后应为False
+        """
+        if not self.enable_genai:
+            return {
+                "status": "disabled",
+                "message": "GenAI功能已禁用"
+            }
+            
+        self._ensure_genai()
+        if not self.genai_available:
             return {
                 "status": "unavailable",
                 "message": "GenAI模块不可用"
@@ -116,7 +236,7 @@ class AudioFileManager:
             
         # 检查提供者是否可用
         try:
-            provider_available = self.filename_analyzer.llm_provider.is_available()
+            provider_available = self.filename_analyzer.llm_provider.is_available(use_cache)
             provider_name = self.filename_analyzer.llm_provider.get_provider_name()
             
             # 获取当前使用的模型名称
@@ -142,6 +262,31 @@ class AudioFileManager:
                 "message": f"检查服务状态时出错: {str(e)}"
             }
     
+    def _get_genai_signature(self) -> str:
+        """获取当前GenAI配置签名，配置变化后索引中的GenAI结果将失效"""
+        if not self.is_genai_enabled():
+            return ""
+        
+        try:
+            llm_provider = self.filename_analyzer.llm_provider
+            analysis_config = self.config_manager.config.analysis
+            # 提示词版本和影响分析结果的配置项（并发数、批量大小、缓存配置不影响结果）
+            parts = [
+                llm_provider.get_provider_name(),
+                self._get_current_model_name(),
+                llm_provider.PROMPT_VERSION,
+                analysis_config.max_song_name_length,
+                analysis_config.default_language,
+                analysis_config.use_file_tags,
+                analysis_config.local_confidence_threshold,
+                analysis_config.language_confidence_threshold,
+                analysis_config.use_artist_lexicon,
+                analysis_config.artist_list_file
+            ]
+            return "|".join(str(part) for part in parts)
+        except Exception:
+            return ""
+    
     def _get_current_model_name(self) -> str:
         """获取当前使用的模型名称"""
         try:
@@ -169,20 +314,18 @@ class AudioFileManager:
     
     def has_number_prefix(self, filename: str) -> bool:
         """检查文件名是否已有数字前缀"""
-        pattern = r'^\d+-'
-        return bool(re.match(pattern, filename))
+        return bool(PREFIX_PATTERN.match(filename))
     
     def extract_number_from_prefix(self, filename: str) -> int:
         """从文件名前缀提取数字"""
-        match = re.match(r'^(\d+)-', filename)
+        match = PREFIX_PATTERN.match(filename)
         return int(match.group(1)) if match else None
     
     def get_clean_filename(self, filename: str) -> str:
         """获取去除序号前缀的文件名，用于排序"""
-        if self.has_number_prefix(filename):
-            # 移除序号前缀
-            return re.sub(r'^\d+-', '', filename)
-        return filename
+        # 移除序号前缀（一次匹配完成判断和截取）
+        match = PREFIX_PATTERN.match(filename)
+        return filename[match.end():] if match else filename
     
     def get_pinyin_sort_key(self, filename: str) -> str:
         """获取用于拼音排序的键值"""
@@ -190,11 +333,8 @@ class AudioFileManager:
         # 去除扩展名进行拼音转换
         name_without_ext = Path(clean_name).stem
         
-        # 将汉字转换为拼音，用于排序
-        pinyin_list = lazy_pinyin(name_without_ext, style=Style.NORMAL)
-        # 将拼音列表转换为字符串，用空格连接
-        pinyin_str = ' '.join(pinyin_list)
-        return pinyin_str.lower()
+        # 将汉字转换为拼音，用空格连接，用于排序
+        return collation_key(name_without_ext)
     
     def _get_llm_suggestion_sort_key(self, file_info: Dict) -> str:
         """
@@ -211,8 +351,7 @@ class AudioFileManager:
         if llm_suggested_name:
             try:
                 # 使用拼音排序LLM建议的完整文件名
-                pinyin_list = lazy_pinyin(llm_suggested_name, style=Style.NORMAL)
-                return ' '.join(pinyin_list).lower()
+                return collation_key(llm_suggested_name)
             except:
                 return llm_suggested_name.lower()
         
@@ -221,57 +360,72 @@ class AudioFileManager:
         if genai_analysis:
             # 如果已经是标准格式，使用原文件名
             if genai_analysis.get('is_standard_format', False):
-                return self.get_pinyin_sort_key(file_info['original_name'])
+                return self._get_file_pinyin_key(file_info)
             
             # 如果有错误，将错误的文件排在最后
             if 'error' in genai_analysis:
-                return 'zzz_error_' + self.get_pinyin_sort_key(file_info['original_name'])
+                return 'zzz_error_' + self._get_file_pinyin_key(file_info)
             
             # 使用GenAI分析中的建议文件名（格式：歌手-语言-歌曲名）
             suggested_name = genai_analysis.get('suggested_name', '')
             if suggested_name:
                 try:
                     # 使用拼音排序
-                    pinyin_list = lazy_pinyin(suggested_name, style=Style.NORMAL)
-                    return ' '.join(pinyin_list).lower()
+                    return collation_key(suggested_name)
                 except:
                     return suggested_name.lower()
         
         # 如果没有任何AI建议，使用原文件名
-        return self.get_pinyin_sort_key(file_info['original_name'])
+        return self._get_file_pinyin_key(file_info)
+    
+    def _get_clean_name(self, file_info: Dict) -> str:
+        """获取去除序号前缀的文件名，优先使用分析时已计算的结果"""
+        return file_info.get('clean_name') or self.get_clean_filename(file_info['original_name'])
+    
+    def _get_file_pinyin_key(self, file_info: Dict) -> str:
+        """获取文件的拼音排序键，优先使用分析时已计算的结果"""
+        pinyin_key = file_info.get('pinyin_key')
+        if pinyin_key is None:
+            pinyin_key = self.get_pinyin_sort_key(file_info['original_name'])
+        return pinyin_key
+    
+    def scan_audio_files(self, folder_path: str) -> List[AudioFileEntry]:
+        """单次遍历获取文件夹中所有音频文件及其元数据"""
+        return scan_audio_files(folder_path, self.AUDIO_EXTENSIONS, self.metadata_fetcher)
     
     def get_audio_files(self, folder_path: str) -> List[str]:
         """获取文件夹中的所有音频文件"""
-        try:
-            audio_files = []
-            for item in os.listdir(folder_path):
-                item_path = os.path.join(folder_path, item)
-                if os.path.isfile(item_path) and self.is_audio_file(item):
-                    audio_files.append(item)
-            return audio_files
-        except Exception as e:
-            return []
+        return [entry.name for entry in self.scan_audio_files(folder_path)]
     
     def get_file_info(self, folder_path: str, filename: str) -> Dict:
         """获取文件的详细信息"""
-        file_path = os.path.join(folder_path, filename)
-        try:
-            stat = os.stat(file_path)
-            return {
-                'name': filename,
-                'size': stat.st_size,
-                'created_time': stat.st_ctime,
-                'modified_time': stat.st_mtime,
-                'path': file_path
-            }
-        except Exception as e:
-            return {
+        return self.get_files_info(folder_path, [filename])[0]
+    
+    def get_files_info(self, folder_path: str, filenames: List[str]) -> List[Dict]:
+        """批量获取文件的详细信息（按所在挂载点的并发数并行读取元数据）"""
+        file_paths = [os.path.join(folder_path, filename) for filename in filenames]
+        stats = self.metadata_fetcher.stat_paths(file_paths, folder_path)
+        
+        infos = []
+        for filename, file_path, stat in zip(filenames, file_paths, stats):
+            infos.append({
                 'name': filename,
-                'size': 0,
-                'created_time': 0,
-                'modified_time': 0,
+                'size': stat.st_size if stat else 0,
+                'created_time': stat.st_ctime if stat else 0,
+                'modified_time': stat.st_mtime if stat else 0,
                 'path': file_path
-            }
+            })
+        return infos
+    
+    def get_metadata_latency(self) -> List[Dict]:
+        """
+        获取读取文件元数据时观测到的耗时统计
+        
+        Returns:
+            List[Dict]: 每个挂载点一项，包含并发数、调用次数和耗时分位数（毫秒），
+                        可据此在 scan_config.json 中调整该挂载点的并发数
+        """
+        return self.metadata_fetcher.get_latency_stats()
     
     def sort_files(self, folder_path: str, filenames: List[str], sort_method: str) -> List[str]:
         """根据指定方法对文件进行排序"""
@@ -279,12 +433,10 @@ class AudioFileManager:
             return []
         
         # 获取所有文件的详细信息
-        file_infos = []
-        for filename in filenames:
-            info = self.get_file_info(folder_path, filename)
+        file_infos = self.get_files_info(folder_path, filenames)
+        for info in file_infos:
             # 添加去除序号前缀的文件名，用于文件名排序
-            info['clean_name'] = self.get_clean_filename(filename)
-            file_infos.append(info)
+            info['clean_name'] = self.get_clean_filename(info['name'])
         
         # 根据排序方法进行排序
         sort_key_map = {
@@ -305,92 +457,135 @@ class AudioFileManager:
         file_infos.sort(key=sort_key, reverse=reverse)
         return [info['name'] for info in file_infos]
     
-    def analyze_files(self, folder_path: str, sort_method: str = "文件名称 (A-Z)", progress_callback=None) -> Dict:
+    def analyze_files(self, folder_path: str, sort_method: str = "文件名称 (A-Z)", progress_callback=None,
+                      numbering: str = NUMBERING_SEQUENTIAL) -> Dict:
         """分析文件夹中的音频文件状态"""
-        if progress_callback:
-            progress_callback(0, "开始分析...")
-            
-        audio_files = self.get_audio_files(folder_path)
+        result = None
+        for event, payload in self.iter_analyze_files(folder_path, sort_method, progress_callback, numbering):
+            if event == 'done':
+                result = payload
+        return result
+    
+    def iter_analyze_files(self, folder_path: str, sort_method: str = "文件名称 (A-Z)",
+                           progress_callback=None, numbering: str = NUMBERING_SEQUENTIAL
+                           ) -> Iterator[Tuple[str, Dict]]:
+        """
+        分析文件夹中的音频文件状态，分阶段产出结果
+        
+        Args:
+            folder_path: 文件夹路径
+            sort_method: 排序方式
+            progress_callback: 进度回调
+            numbering: 编号方式（NUMBERING_SEQUENTIAL 或 NUMBERING_MINIMAL）
+        
+        Yields:
+            Tuple[str, Dict]: (事件, 数据)，事件依次为：
+                - 'scanned': 扫描和编号检查完成，数据为分析结果（尚未包含本次的GenAI结果）
+                - 'genai': 某个文件得到GenAI分析结果，数据为该文件的文件信息
+                - 'done': 分析完成，数据为最终的分析结果
+        """
+        # 合并高频的进度回调
+        progress_callback = ProgressAggregator.wrap(progress_callback)
         
         if progress_callback:
-            progress_callback(10, f"发现 {len(audio_files)} 个音频文件")
+            progress_callback(0, "开始分析...")
             
-        # 根据用户选择的方法排序
-        audio_files = self.sort_files(folder_path, audio_files, sort_method)
+        # 单次扫描同时获得文件列表和元数据，排序统一在生成建议文件名时进行
+        entries = self.scan_audio_files(folder_path)
         
         if progress_callback:
-            progress_callback(20, "文件排序完成")
+            progress_callback(10, f"发现 {len(entries)} 个音频文件")
         
         result = {
-            'total_files': len(audio_files),
+            'total_files': len(entries),
             'files': [],
             'needs_renaming': False,
             'has_gaps': False,
             'duplicate_numbers': False,
             'folder_path': folder_path,
             'needs_rename_count': 0,
-            'sort_method': sort_method  # 保存排序方式，用于生成建议文件名
+            'sort_method': sort_method,  # 保存排序方式，用于生成建议文件名
+            'numbering': numbering  # 保存编号方式，用于生成建议文件名
         }
         
-        used_numbers = set()
-        total_files = len(audio_files)
+        total_files = len(entries)
+        genai_signature = self._get_genai_signature()
+        
+        # 读取索引，未变化的文件直接复用上次的派生数据
+        indexed = self._load_index(folder_path)
+        changed_files = []
         
-        for i, filename in enumerate(audio_files):
+        for i, entry in enumerate(entries):
             if progress_callback:
-                progress = 20 + int((i / total_files) * 30)  # 20-50%
-                progress_callback(progress, f"分析文件: {filename}")
-                
-            # 获取文件的详细信息
-            file_details = self.get_file_info(folder_path, filename)
-            
-            file_info = {
-                'original_name': filename,
-                'has_prefix': self.has_number_prefix(filename),
-                'suggested_name': '',
-                'status': 'ok',
-                'size': file_details['size'],
-                'created_time': file_details['created_time'],
-                'modified_time': file_details['modified_time'],
-                # GenAI相关字段
-                'genai_analysis': None,
-                'llm_suggested_name': None,
-                'needs_genai_analysis': False
-            }
+                progress = 10 + int((i / total_files) * 40)  # 10-50%
+                progress_callback(progress, f"分析文件: {entry.name}", i + 1, total_files)
             
-            if file_info['has_prefix']:
-                number = self.extract_number_from_prefix(filename)
-                if number in used_numbers:
-                    file_info['status'] = 'duplicate_number'
-                    result['duplicate_numbers'] = True
-                else:
-                    used_numbers.add(number)
+            # 紧凑记录，兼容字典式访问
+            file_info = FileRecord(entry.name, entry.size, entry.created_time,
+                                   entry.modified_time, entry.inode)
+            
+            record = indexed.get(entry.name)
+            if record and AnalysisIndex.is_entry_current(record, entry.size, entry.modified_time, entry.inode):
+                file_info.has_prefix = record['has_prefix']
+                file_info.prefix_number = record['prefix_number']
+                file_info.clean_name = record['clean_name']
+                file_info.pinyin_key = record['pinyin_key']
+                
+                if genai_signature and record['genai_signature'] == genai_signature:
+                    self._apply_genai_analysis(file_info, record['genai_analysis'])
             else:
-                file_info['status'] = 'no_prefix'
-                result['needs_renaming'] = True
+                match = PREFIX_PATTERN.match(entry.name)
+                file_info.has_prefix = match is not None
+                file_info.prefix_number = int(match.group(1)) if match else None
+                file_info.clean_name = entry.name[match.end():] if match else entry.name
+                changed_files.append(file_info)
             
             result['files'].append(file_info)
         
-        if progress_callback:
-            progress_callback(50, "检查编号连续性...")
-            
-        # 检查编号是否连续
-        if used_numbers:
-            expected_numbers = set(range(1, max(used_numbers) + 1))
-            if used_numbers != expected_numbers:
-                result['has_gaps'] = True
+        # 新文件的拼音排序键批量计算
+        pinyin_keys = collation_keys(Path(file_info.clean_name).stem for file_info in changed_files)
+        for file_info, pinyin_key in zip(changed_files, pinyin_keys):
+            file_info.pinyin_key = pinyin_key
+        
+        # 先按现有数据编号，让调用方可以立即显示文件列表
+        self._generate_suggested_names(result, folder_path)
+        self._check_numbering(result)
+        result['needs_rename_count'] = self._count_files_needing_rename(result)
+        yield 'scanned', result
         
-        # 如果GenAI启用，先进行文件名分析
+        # 如果GenAI启用，进行文件名分析，逐个产出分析结果
         if self.is_genai_enabled():
             if progress_callback:
                 progress_callback(60, "使用AI分析文件名...")
-            self._analyze_filenames_with_genai(result, progress_callback)
+            analyzed_files = []
+            for file_info in self._iter_genai_analysis(result, progress_callback):
+                analyzed_files.append(file_info)
+                yield 'genai', file_info
+            
+            # 新得到GenAI结果的文件也需要写回索引
+            changed_names = {file_info['original_name'] for file_info in changed_files}
+            changed_files.extend(
+                file_info for file_info in analyzed_files
+                if file_info['original_name'] not in changed_names
+            )
+        
+        # 更新索引：写入变化的文件，删除已不存在的文件
+        current_names = {entry.name for entry in entries}
+        removed_names = [name for name in indexed if name not in current_names]
+        self._update_index(folder_path, changed_files, removed_names, genai_signature)
         
         if progress_callback:
             progress_callback(80, "生成建议文件名...")
             
-        # 生成建议的文件名（根据排序方式）
+        # 结合GenAI结果重新生成建议的文件名（根据排序方式）
         self._generate_suggested_names(result, folder_path)
         
+        if progress_callback:
+            progress_callback(85, "检查编号连续性...")
+        
+        # 按最终顺序检查编号状态
+        self._check_numbering(result)
+        
         if progress_callback:
             progress_callback(90, "统计需要重命名的文件...")
             
@@ -400,43 +595,198 @@ class AudioFileManager:
         if progress_callback:
             progress_callback(100, "分析完成！")
         
-        return result
+        yield 'done', result
+    
+    def resort_analysis(self, analysis: Dict, sort_method: str, numbering: Optional[str] = None) -> Dict:
+        """
+        按新的排序方式重新排列已有的分析结果
+        
+        只使用分析结果中已缓存的数据重新排序并生成序号，不访问文件系统，也不调用LLM。
+        
+        Args:
+            analysis: analyze_files 返回的分析结果（就地更新）
+            sort_method: 新的排序方式
+            numbering: 新的编号方式（默认: 保持不变）
+            
+        Returns:
+            Dict: 更新后的分析结果
+        """
+        analysis['sort_method'] = sort_method
+        if numbering is not None:
+            analysis['numbering'] = numbering
+        self._generate_suggested_names(analysis, analysis['folder_path'])
+        self._check_numbering(analysis)
+        analysis['needs_rename_count'] = self._count_files_needing_rename(analysis)
+        return analysis
+    
+    def _check_numbering(self, result: Dict):
+        """按当前文件顺序检查编号前缀的缺失、重复和连续性"""
+        used_numbers = set()
+        result['needs_renaming'] = False
+        result['duplicate_numbers'] = False
+        result['has_gaps'] = False
+        
+        for file_info in result['files']:
+            if file_info['has_prefix']:
+                number = file_info.get('prefix_number')
+                if number is None:
+                    number = self.extract_number_from_prefix(file_info['original_name'])
+                if number in used_numbers:
+                    file_info['status'] = 'duplicate_number'
+                    result['duplicate_numbers'] = True
+                else:
+                    file_info['status'] = 'ok'
+                    used_numbers.add(number)
+            else:
+                file_info['status'] = 'no_prefix'
+                result['needs_renaming'] = True
+        
+        # 检查编号是否连续
+        if used_numbers:
+            expected_numbers = set(range(1, max(used_numbers) + 1))
+            if used_numbers != expected_numbers:
+                result['has_gaps'] = True
+    
+    def _load_index(self, folder_path: str) -> Dict[str, Dict]:
+        """读取文件夹索引，索引不可用时返回空结果"""
+        if self.analysis_index is None:
+            return {}
+        
+        try:
+            return self.analysis_index.load_folder(folder_path)
+        except Exception:
+            return {}
+    
+    def _update_index(self, folder_path: str, changed_files: List[Dict],
+                      removed_names: List[str], genai_signature: str):
+        """写回文件夹索引，失败时不影响分析结果"""
+        if self.analysis_index is None or (not changed_files and not removed_names):
+            return
+        
+        try:
+            self.analysis_index.update_folder(folder_path, changed_files, removed_names, genai_signature)
+        except Exception:
+            pass
+    
+    def _apply_genai_analysis(self, file_info: Dict, analysis: Optional[Dict]):
+        """将GenAI分析结果写入文件信息"""
+        file_info['genai_analysis'] = analysis
+        if not analysis:
+            return
+        
+        # 如果分析成功且不是标准格式，记录LLM建议的文件名
+        if analysis.get('needs_analysis', False) and not analysis.get('is_standard_format', False):
+            file_info['needs_genai_analysis'] = True
+            file_info['llm_suggested_name'] = analysis.get('suggested_name', '')
+        elif analysis.get('is_standard_format', False):
+            # 已经是标准格式，不需要分析
+            file_info['needs_genai_analysis'] = False
     
-    def _analyze_filenames_with_genai(self, result: Dict, progress_callback=None):
-        """使用GenAI分析文件名"""
+    def _analyze_filenames_with_genai(self, result: Dict, progress_callback=None) -> List[Dict]:
+        """
+        使用GenAI分析文件名
+        
+        已从索引中取得GenAI结果的文件会被跳过。
+        
+        Returns:
+            List[Dict]: 本次实际进行了分析的文件信息
+        """
+        return list(self._iter_genai_analysis(result, progress_callback))
+    
+    def _iter_genai_analysis(self, result: Dict, progress_callback=None) -> Iterator[Dict]:
+        """
+        使用GenAI分析文件名，每得到一个结果就产出对应的文件信息
+        
+        已从索引中取得GenAI结果的文件会被跳过。
+        """
         if not self.filename_analyzer:
             return
-            
-        total_files = len(result['files'])
         
-        for i, file_info in enumerate(result['files']):
-            filename = file_info['original_name']
-            
+        pending_files = [file_info for file_info in result['files'] if file_info['genai_analysis'] is None]
+        if not pending_files:
+            return
+        
+        progress_callback = ProgressAggregator.wrap(progress_callback)
+        
+        # 标签中已有歌手和歌曲名的文件直接得出结果，只有其余文件需要请求LLM
+        tagged_files, tag_artists = self._read_tag_analysis(result['folder_path'], pending_files, progress_callback)
+        for file_info, analysis in tagged_files:
+            self._apply_genai_analysis(file_info, analysis)
+            yield file_info
+        if tagged_files:
+            tagged_names = {file_info['original_name'] for file_info, _ in tagged_files}
+            pending_files = [file_info for file_info in pending_files if file_info['original_name'] not in tagged_names]
+            if not pending_files:
+                return
+        
+        def on_file_analyzed(completed: int, total: int, filename: str):
             if progress_callback:
-                progress = 60 + int((i / total_files) * 20)  # 60-80%
-                progress_callback(progress, f"AI分析文件名: {filename}")
-            
-            try:
-                # 使用GenAI分析文件名
-                analysis = self.filename_analyzer.analyze_filename(filename)
-                file_info['genai_analysis'] = analysis
-                
-                # 如果分析成功且不是标准格式，记录LLM建议的文件名
-                if analysis.get('needs_analysis', False) and not analysis.get('is_standard_format', False):
-                    file_info['needs_genai_analysis'] = True
-                    file_info['llm_suggested_name'] = analysis.get('suggested_name', '')
-                elif analysis.get('is_standard_format', False):
-                    # 已经是标准格式，不需要分析
-                    file_info['needs_genai_analysis'] = False
-                    
-            except Exception as e:
-                # 分析失败，记录错误
-                file_info['genai_analysis'] = {
+                progress = 60 + int((completed / total) * 20)  # 60-80%
+                progress_callback(progress, f"AI分析文件名 ({completed}/{total}): {filename}", completed, total)
+        
+        analyzed = set()
+        try:
+            # 使用GenAI并发分析文件名，按完成顺序得到结果
+            for i, analysis in self.filename_analyzer.iter_batch_analyze(
+                [file_info['original_name'] for file_info in pending_files],
+                progress_callback=on_file_analyzed,
+                artist_hints=[tag_artists.get(file_info['original_name'], '') for file_info in pending_files]
+            ):
+                analyzed.add(i)
+                self._apply_genai_analysis(pending_files[i], analysis)
+                yield pending_files[i]
+        except Exception as e:
+            # 分析失败，为尚未得到结果的文件记录错误
+            for i, file_info in enumerate(pending_files):
+                if i in analyzed:
+                    continue
+                self._apply_genai_analysis(file_info, {
                     'error': f'分析失败: {str(e)}',
                     'needs_analysis': True,
                     'is_standard_format': False
-                }
-                file_info['needs_genai_analysis'] = True
+                })
+                yield file_info
+    
+    def _read_tag_analysis(self, folder_path: str, files: List[Dict],
+                           progress_callback=None) -> Tuple[List[Tuple[Dict, Dict]], Dict[str, str]]:
+        """
+        读取文件标签，为标签完整（包含歌手和歌曲名）的文件生成分析结果
+        
+        标签只读取文件头部，按文件夹所在挂载点的并发数并行读取；已符合标准格式的文件不读取。
+        
+        Returns:
+            Tuple: ((文件信息, 分析结果) 列表, 标签不完整但有歌手名的文件名 -> 歌手名)
+        """
+        analyzer = self.filename_analyzer
+        if not analyzer.uses_file_tags():
+            return [], {}
+        
+        candidates = [file_info for file_info in files if not analyzer.is_standard_format(file_info['original_name'])]
+        if not candidates:
+            return [], {}
+        
+        if progress_callback:
+            progress_callback(60, f"读取文件标签 ({len(candidates)} 个文件)...")
+        
+        all_tags = self.metadata_fetcher.map_paths(
+            read_tags, [os.path.join(folder_path, file_info['original_name']) for file_info in candidates], folder_path
+        )
+        
+        tagged = []
+        tag_artists = {}
+        for file_info, tags in zip(candidates, all_tags):
+            if tags is None:
+                continue
+            if not tags.is_complete:
+                # 只有歌手名时用于确认文件名中歌手所在的一侧
+                if tags.artist or tags.album_artist:
+                    tag_artists[file_info['original_name']] = tags.artist or tags.album_artist
+                continue
+            analysis = analyzer.create_tag_result(
+                file_info['original_name'], tags.artist or tags.album_artist, tags.title, tags.language
+            )
+            tagged.append((file_info, analysis))
+        return tagged, tag_artists
     
     def _generate_suggested_names(self, result: Dict, folder_path: str):
         """为文件生成建议的文件名"""
@@ -446,65 +796,126 @@ class AudioFileManager:
         # 获取排序方式，按照用户选择的方式重新排序所有文件
         sort_method = result.get('sort_method', '文件名称 (A-Z)')
         
-        # 创建文件信息列表，包含原文件名和去除前缀的文件名
-        file_items = []
-        for file_info in result['files']:
-            clean_name = self.get_clean_filename(file_info['original_name'])
-            file_items.append({
-                'file_info': file_info,
-                'clean_name': clean_name,
-                'size': file_info['size'],
-                'created_time': file_info['created_time'],
-                'modified_time': file_info['modified_time']
-            })
-        
-        # 根据排序方式对文件进行排序
-        sort_key_map = {
-            "LLM建议 (A-Z)": lambda x: self._get_llm_suggestion_sort_key(x['file_info']),
-            "LLM建议 (Z-A)": lambda x: self._get_llm_suggestion_sort_key(x['file_info']),
-            "文件名称 (A-Z)": lambda x: self.get_pinyin_sort_key(x['file_info']['original_name']),
-            "文件名称 (Z-A)": lambda x: self.get_pinyin_sort_key(x['file_info']['original_name']),
-            "文件大小 (小到大)": lambda x: x['size'],
-            "文件大小 (大到小)": lambda x: x['size']
-        }
-        
-        reverse_methods = {
-            "LLM建议 (Z-A)",
-            "文件名称 (Z-A)", 
-            "文件大小 (大到小)"
-        }
+        files = result['files']
+        reverse = sort_method in self.REVERSE_SORT_METHODS
         
-        sort_key = sort_key_map.get(sort_method, lambda x: x['clean_name'].lower())
-        reverse = sort_method in reverse_methods
+        # 按照用户选择的方式排序：先计算每个文件的排序键，再做间接排序，不为每个文件创建包装对象
+        if sort_method in ("文件大小 (小到大)", "文件大小 (大到小)"):
+            # 数值列使用向量化的 argsort（未安装NumPy时退回内置排序）
+            order = argsort_numbers([file_info['size'] for file_info in files], reverse)
+        else:
+            if sort_method in ("LLM建议 (A-Z)", "LLM建议 (Z-A)"):
+                sort_keys = [self._get_llm_suggestion_sort_key(file_info) for file_info in files]
+            elif sort_method in ("文件名称 (A-Z)", "文件名称 (Z-A)"):
+                sort_keys = [self._get_file_pinyin_key(file_info) for file_info in files]
+            else:
+                sort_keys = [self._get_clean_name(file_info).lower() for file_info in files]
+            order = sorted(range(len(files)), key=sort_keys.__getitem__, reverse=reverse)
+        sorted_files = [files[index] for index in order]
         
-        # 按照用户选择的方式排序
-        file_items.sort(key=sort_key, reverse=reverse)
+        # 按照编号方式为排序后的文件分配序号前缀
+        prefixes = self._assign_number_prefixes(
+            sorted_files,
+            result.get('numbering', self.NUMBERING_SEQUENTIAL)
+        )
         
-        # 按照新的排序顺序分配序号并更新result['files']的顺序
-        sorted_files = []
-        for index, item in enumerate(file_items, 1):
-            file_info = item['file_info']
-            clean_name = item['clean_name']
-            
+        # 按照新的排序顺序分配序号
+        genai_enabled = self.is_genai_enabled()
+        for file_info, prefix in zip(sorted_files, prefixes):
             # 根据是否有GenAI建议来生成文件名
-            if (self.is_genai_enabled() and 
+            if (genai_enabled and 
                 file_info.get('llm_suggested_name') and 
                 file_info.get('needs_genai_analysis', False)):
                 # 使用GenAI建议的文件名
                 base_name = file_info['llm_suggested_name']
                 # 保持原文件扩展名
                 original_ext = Path(file_info['original_name']).suffix
-                file_info['suggested_name'] = f"{index:02d}-{base_name}{original_ext}"
+                file_info['suggested_name'] = f"{prefix}{base_name}{original_ext}"
             else:
                 # 使用传统方式：序号 + 去除前缀的原文件名
-                file_info['suggested_name'] = f"{index:02d}-{clean_name}"
-            
-            # 添加到排序后的文件列表
-            sorted_files.append(file_info)
+                file_info['suggested_name'] = f"{prefix}{self._get_clean_name(file_info)}"
         
         # 更新result['files']为排序后的顺序
         result['files'] = sorted_files
     
+    def _assign_number_prefixes(self, files: List[Dict], numbering: str) -> List[str]:
+        """
+        为已排序的文件分配序号前缀
+        
+        Args:
+            files: 按目标顺序排列的文件信息
+            numbering: 编号方式
+            
+        Returns:
+            List[str]: 与 files 顺序一致的序号前缀（含连字符）
+        """
+        if numbering != self.NUMBERING_MINIMAL:
+            # 补零宽度根据最大编号确定，超过99个文件时所有编号一起加宽以保持按名称排序的顺序
+            width = self._prefix_width(len(files))
+            return [f"{index:0{width}d}-" for index in range(1, len(files) + 1)]
+        
+        kept = self._find_kept_numbers(files)
+        
+        # 保留的编号之间依次填入新编号；选取保留编号时已保证中间的空位足够
+        numbers = []
+        next_number = 1
+        for position in range(len(files)):
+            number = kept.get(position, next_number)
+            numbers.append(number)
+            next_number = number + 1
+        
+        # 新编号的补零宽度根据最大编号自动确定，保留的编号沿用原前缀
+        width = self._prefix_width(max(numbers, default=0))
+        prefixes = []
+        for position, (file_info, number) in enumerate(zip(files, numbers)):
+            if position in kept:
+                prefixes.append(PREFIX_PATTERN.match(file_info['original_name']).group(0))
+            else:
+                prefixes.append(f"{number:0{width}d}-")
+        return prefixes
+    
+    @staticmethod
+    def _prefix_width(max_number: int) -> int:
+        """序号前缀的补零宽度：至少两位，最大编号更长时与其位数一致"""
+        return max(2, len(str(max_number)))
+    
+    def _find_kept_numbers(self, files: List[Dict]) -> Dict[int, int]:
+        """
+        选出可以保留现有编号的文件
+        
+        位置 i（从0开始）的文件保留编号 n_i 时，前面至少要有 i 个可用编号，即 n_i - i >= 1；
+        两个保留的文件 i < j 之间要能放下中间的文件，即 n_j - j >= n_i - i。
+        因此保留的文件就是 n_i - i 的最长非递减子序列，用耐心排序在 O(n log n) 内求出。
+        
+        Returns:
+            Dict[int, int]: 位置 -> 保留的编号
+        """
+        tail_keys = []  # 长度为 k+1 的子序列的最小结尾值
+        tail_positions = []  # 对应的文件位置
+        previous = {}  # 位置 -> 子序列中前一个文件的位置
+        
+        for position, file_info in enumerate(files):
+            number = file_info.get('prefix_number') if file_info.get('has_prefix') else None
+            if number is None or number - position < 1:
+                continue
+            
+            key = number - position
+            length = bisect_right(tail_keys, key)
+            previous[position] = tail_positions[length - 1] if length else None
+            if length == len(tail_keys):
+                tail_keys.append(key)
+                tail_positions.append(position)
+            else:
+                tail_keys[length] = key
+                tail_positions[length] = position
+        
+        kept = {}
+        position = tail_positions[-1] if tail_positions else None
+        while position is not None:
+            kept[position] = files[position]['prefix_number']
+            position = previous[position]
+        return kept
+    
     def _count_files_needing_rename(self, result: Dict) -> int:
         """统计实际需要重命名的文件数量"""
         count = 0
@@ -513,69 +924,213 @@ class AudioFileManager:
                 count += 1
         return count
     
+    def get_rename_mappings(self, analysis: Dict) -> Dict[str, str]:
+        """从分析结果中取出需要重命名的文件：原文件名 -> 建议文件名"""
+        return {
+            file_info['original_name']: file_info['suggested_name']
+            for file_info in analysis['files']
+            if file_info['original_name'] != file_info['suggested_name']
+        }
+    
+    def plan_renames(self, folder_path: str, file_mappings: Dict[str, str], use_exchange: bool = False) -> RenamePlan:
+        """
+        生成重命名计划
+        
+        Args:
+            folder_path: 文件夹路径
+            file_mappings: 原文件名到新文件名的映射
+            use_exchange: 两个文件互换名称时是否使用原子交换
+        Returns:
+            RenamePlan: 重命名计划
+        """
+        try:
+            existing_names = os.listdir(folder_path)
+        except OSError:
+            existing_names = []
+        return plan_renames(file_mappings, existing_names, use_exchange=use_exchange)
+    
     def rename_files(self, folder_path: str, file_mappings: Dict[str, str], progress_callback=None) -> Tuple[int, List[str]]:
-        """重命名文件"""
-        success_count = 0
-        errors = []
-        total_files = len(file_mappings)
+        """
+        重命名文件
+        
+        按重命名计划执行：目标名称空闲的文件直接重命名，只有循环中的文件才使用临时名称。
+        在支持 renameat2 的Linux系统上，重命名不会覆盖已有文件，两个文件互换名称时直接原子交换。
+        执行前先把完整计划写入重命名日志，中断后可以恢复，完成后可以撤销。
+        """
+        # 合并高频的进度回调
+        progress_callback = ProgressAggregator.wrap(progress_callback)
         
         if progress_callback:
             progress_callback(0, "开始重命名文件...")
         
-        # 两阶段重命名以避免文件名冲突
-        temp_mappings = {}
+        renamer = create_renamer(folder_path) if file_mappings else None
+        try:
+            plan = self.plan_renames(folder_path, file_mappings, use_exchange=renamer is not None)
+            errors = list(plan.conflicts)
+            
+            success_count = self._execute_rename_operations(
+                folder_path, plan.operations, errors, progress_callback, "重命名", renamer
+            )
+        finally:
+            if renamer is not None:
+                renamer.close()
+        
+        if progress_callback:
+            progress_callback(100, f"重命名完成！（比两阶段重命名减少 {plan.saved_operations} 次操作）")
+        
+        return success_count, errors
+    
+    def has_interrupted_rename(self, folder_path: str) -> bool:
+        """检查文件夹中是否有未完成的重命名"""
+        state = RenameJournal(folder_path).load()
+        return state is not None and not state.complete
+    
+    def can_undo_rename(self, folder_path: str) -> bool:
+        """检查文件夹中是否有可以撤销的重命名"""
+        state = RenameJournal(folder_path).load()
+        return state is not None and bool(state.operations)
+    
+    def undo_last_rename(self, folder_path: str, progress_callback=None) -> Tuple[int, List[str]]:
+        """
+        撤销上一次重命名，或回滚被中断的重命名
+        
+        根据重命名日志确定已执行的操作，按相反顺序逐个还原。
+        撤销本身也记录在日志中，再次撤销即恢复为撤销前的文件名。
+        
+        Returns:
+            Tuple[int, List[str]]: (还原的文件数量, 错误信息列表)
+        """
+        progress_callback = ProgressAggregator.wrap(progress_callback)
+        
+        if progress_callback:
+            progress_callback(0, "开始撤销重命名...")
+        
+        journal = RenameJournal(folder_path)
+        state = journal.load()
+        if state is None:
+            return 0, ["没有可以撤销的重命名"]
+        
+        operations = journal.invert_operations(journal.get_completed_operations(state))
+        errors = []
+        renamer = create_renamer(folder_path) if operations else None
+        try:
+            success_count = self._execute_rename_operations(
+                folder_path, operations, errors, progress_callback, "还原", renamer
+            )
+        finally:
+            if renamer is not None:
+                renamer.close()
+        
+        if progress_callback:
+            progress_callback(100, "撤销完成！")
+        
+        return success_count, errors
+    
+    def _execute_rename_operations(self, folder_path: str, operations: List[RenameOperation],
+                                   errors: List[str], progress_callback=None, action: str = "重命名",
+                                   renamer: Optional[LinuxRenamer] = None) -> int:
+        """
+        按顺序执行重命名操作，并记录到重命名日志
+        
+        提供 renamer 时使用 renameat2 执行（不覆盖已有文件、支持交换），否则使用 os.rename。
+        
+        Returns:
+            int: 成功改为最终名称的文件数量
+        """
+        success_count = 0
+        total_operations = len(operations)
+        
+        journal = RenameJournal(folder_path)
+        try:
+            journal.begin(operations)
+        except Exception as e:
+            journal.close()
+            errors.append(f"无法写入重命名日志: {str(e)}")
+            return 0
+        
+        # 临时名称 -> 原文件名，用于最终重命名失败时恢复
+        temp_origins = {}
         
         try:
-            # 第一阶段：重命名为临时文件名
-            for i, (original_name, new_name) in enumerate(file_mappings.items()):
+            for i, operation in enumerate(operations):
                 if progress_callback:
-                    progress = int((i / total_files) * 50)  # 0-50%
-                    progress_callback(progress, f"第一阶段: {original_name}")
+                    progress = int((i / total_operations) * 100)
+                    progress_callback(progress, f"{action}: {operation.source}", i + 1, total_operations)
                 
-                if original_name != new_name:
-                    original_path = os.path.join(folder_path, original_name)
-                    temp_name = f"__temp__{success_count}__" + new_name
-                    temp_path = os.path.join(folder_path, temp_name)
-                    
+                if operation.exchange:
                     try:
-                        os.rename(original_path, temp_path)
-                        temp_mappings[temp_name] = new_name
-                        success_count += 1
+                        if renamer is None:
+                            raise OSError("当前系统不支持交换文件名")
+                        renamer.exchange(operation.source, operation.target)
                     except Exception as e:
-                        errors.append(f"重命名 {original_name} 失败: {str(e)}")
-            
-            if progress_callback:
-                progress_callback(50, "第一阶段完成，开始第二阶段...")
-            
-            # 第二阶段：重命名为最终文件名
-            for i, (temp_name, final_name) in enumerate(temp_mappings.items()):
-                if progress_callback:
-                    progress = 50 + int((i / len(temp_mappings)) * 50)  # 50-100%
-                    progress_callback(progress, f"第二阶段: {final_name}")
-                
-                temp_path = os.path.join(folder_path, temp_name)
-                final_path = os.path.join(folder_path, final_name)
+                        errors.append(f"{action} {operation.source} 失败: 无法与 {operation.target} 交换名称: {str(e)}")
+                        journal.record(i, False)
+                        continue
+                    
+                    journal.record(i, True)
+                    success_count += 2
+                    continue
                 
                 try:
-                    os.rename(temp_path, final_path)
+                    self._rename_no_replace(folder_path, operation.source, operation.target, renamer)
+                except FileExistsError:
+                    errors.append(f"{action} {operation.source} 失败: 目标文件 {operation.target} 已存在")
+                    journal.record(i, False)
+                    self._restore_temp_name(folder_path, operation.source, temp_origins, errors, journal, renamer)
+                    continue
                 except Exception as e:
-                    errors.append(f"最终重命名 {temp_name} 失败: {str(e)}")
-                    # 尝试恢复原始名称
-                    try:
-                        original_name = None
-                        for orig, new in file_mappings.items():
-                            if new == final_name:
-                                original_name = orig
-                                break
-                        if original_name:
-                            os.rename(temp_path, os.path.join(folder_path, original_name))
-                    except:
-                        pass
+                    errors.append(f"{action} {operation.source} 失败: {str(e)}")
+                    journal.record(i, False)
+                    self._restore_temp_name(folder_path, operation.source, temp_origins, errors, journal, renamer)
+                    continue
+                
+                journal.record(i, True)
+                if operation.to_temp:
+                    temp_origins[operation.target] = temp_origins.pop(operation.source, operation.source)
+                else:
+                    temp_origins.pop(operation.source, None)
+                    success_count += 1
+            
+            journal.commit()
         
         except Exception as e:
-            errors.append(f"重命名过程出错: {str(e)}")
+            errors.append(f"{action}过程出错: {str(e)}")
+        finally:
+            journal.close()
         
-        if progress_callback:
-            progress_callback(100, "重命名完成！")
+        return success_count
+    
+    def _rename_no_replace(self, folder_path: str, source: str, target: str,
+                           renamer: Optional[LinuxRenamer] = None):
+        """
+        重命名文件夹中的文件，不覆盖已有文件
         
-        return success_count, errors 
\ No newline at end of file
+        Raises:
+            FileExistsError: 目标名称已存在
+        """
+        if renamer is not None:
+            renamer.rename(source, target)
+            return
+            
+        # 之前的操作失败时目标名称可能仍被占用，不能覆盖已有文件
+        target_path = os.path.join(folder_path, target)
+        if os.path.lexists(target_path):
+            raise FileExistsError(target_path)
+        os.rename(os.path.join(folder_path, source), target_path)
+    
+    def _restore_temp_name(self, folder_path: str, name: str, temp_origins: Dict[str, str],
+                           errors: List[str], journal: RenameJournal, renamer: Optional[LinuxRenamer] = None):
+        """最终重命名失败时，尝试把临时名称恢复为原文件名"""
+        original_name = temp_origins.pop(name, None)
+        if original_name is None:
+            return
+            
+        try:
+            self._rename_no_replace(folder_path, name, original_name, renamer)
+        except FileExistsError:
+            errors.append(f"无法恢复 {name}: 原文件名 {original_name} 已被占用")
+            return
+        except Exception as e:
+            errors.append(f"无法恢复 {name}: {str(e)}")
+            return
+        journal.record_extra(name, original_name)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+拼音排序键
+生成与 ' '.join(lazy_pinyin(text)).lower() 完全一致的排序键：
+逐字查表得到读音唯一的汉字的拼音，只有含多音字或读音特殊的词语的汉字片段才交给 pypinyin 转换，
+整个名称的排序键和汉字片段的转换结果都会被缓存
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# 字符表中的特殊取值
+_NON_HAN = 0  # 非汉字，原样保留
+_AMBIGUOUS = 1  # 多音字或字典中没有的汉字，需要按上下文转换
+
+_char_table: Dict[str, object] = {}  # 字符 -> 拼音 / _NON_HAN / _AMBIGUOUS
+_table_lock = threading.Lock()
+_pypinyin = None
+
+
+def _load_pypinyin():
+    """首次需要时导入 pypinyin 及其字典"""
+    global _pypinyin
+    if _pypinyin is None:
+        with _table_lock:
+            if _pypinyin is None:
+                import pypinyin
+                from pypinyin.constants import PHRASES_DICT, PINYIN_DICT, RE_HANS
+                _pypinyin = (pypinyin, PINYIN_DICT, RE_HANS, PHRASES_DICT)
+    return _pypinyin
+
+
+@lru_cache(maxsize=16384)
+def _has_phrase_exception(run: str) -> bool:
+    """
+    检查汉字片段中出现的词语是否使用了单字读音以外的读音
+
+    例如"燵"单字只有 dá 一个读音，但在"火燵"中读 ta，这类片段不能逐字查表。
+    词语的读音数量与字数不一致时（如儿化）同样不能查表。
+    pypinyin 只会把片段切分为片段中出现的词语，因此只需检查片段的子串，
+    不需要在导入时扫描整个词典。
+    """
+    _, pinyin_dict, _, phrases_dict = _load_pypinyin()
+    for start in range(len(run)):
+        for end in range(start + 1, len(run) + 1):
+            phrase = run[start:end]
+            readings = phrases_dict.get(phrase)
+            if readings is None:
+                continue
+            if len(readings) != len(phrase):
+                return True
+            for char, options in zip(phrase, readings):
+                if options[0] not in pinyin_dict.get(ord(char), '').split(','):
+                    return True
+    return False
+
+
+def _classify_chars(chars: Iterable[str]):
+    """
+    把尚未收录的字符加入字符表
+
+    汉字的判断使用与 pypinyin 分词相同的 RE_HANS；
+    只有所有读音在 NORMAL 风格下都相同的汉字才记录拼音，
+    在词语中使用其它读音的情况由 _has_phrase_exception 按片段检查。
+    """
+    new_chars = [char for char in set(chars) if char not in _char_table]
+    if not new_chars:
+        return
+
+    pypinyin, pinyin_dict, re_hans, _ = _load_pypinyin()
+    entries = {}
+    for char in new_chars:
+        if not re_hans.match(char):
+            entries[char] = _NON_HAN
+        elif ord(char) not in pinyin_dict:
+            entries[char] = _AMBIGUOUS
+        else:
+            readings = pypinyin.pinyin(char, style=pypinyin.Style.NORMAL, heteronym=True)[0]
+            entries[char] = readings[0] if len(set(readings)) == 1 else _AMBIGUOUS
+
+    with _table_lock:
+        _char_table.update(entries)
+
+
+def _split_runs(text: str) -> List[Tuple[bool, str]]:
+    """按是否为汉字把文本切分为连续片段（与 pypinyin 的 simple_seg 一致）"""
+    runs = []
+    start = 0
+    current = None
+    for index, char in enumerate(text):
+        is_han = _char_table[char] is not _NON_HAN
+        if current is None:
+            current = is_han
+        elif is_han != current:
+            runs.append((current, text[start:index]))
+            start = index
+            current = is_han
+    if text:
+        runs.append((current, text[start:]))
+    return runs
+
+
+@lru_cache(maxsize=16384)
+def _convert_han_run(run: str) -> Tuple[str, ...]:
+    """用 pypinyin 转换含多音字的汉字片段（汉字片段之间互不影响，可以单独转换）"""
+    pypinyin = _load_pypinyin()[0]
+    return tuple(pypinyin.lazy_pinyin(run, style=pypinyin.Style.NORMAL))
+
+
+def _build_key(text: str) -> str:
+    """生成排序键（调用前字符表中已收录 text 的全部字符）"""
+    items = []
+    for is_han, run in _split_runs(text):
+        if not is_han:
+            # 非汉字片段整体保留为一项
+            items.append(run)
+            continue
+
+        readings = [_char_table[char] for char in run]
+        if any(reading is _AMBIGUOUS for reading in readings) or _has_phrase_exception(run):
+            items.extend(_convert_han_run(run))
+        else:
+            items.extend(readings)
+
+    return ' '.join(items).lower()
+
+
+@lru_cache(maxsize=65536)
+def collation_key(text: str) -> str:
+    """
+    获取文本的拼音排序键
+
+    Args:
+        text: 文本（通常为不含扩展名和序号前缀的文件名）
+
+    Returns:
+        str: 排序键，与 ' '.join(lazy_pinyin(text, style=Style.NORMAL)).lower() 相同
+    """
+    _classify_chars(text)
+    return _build_key(text)
+
+
+def collation_keys(texts: Iterable[str]) -> List[str]:
+    """
+    批量获取排序键
+
+    先一次性收录所有文本中出现的新字符，再逐个生成排序键，
+    相同的文本只计算一次。
+
+    Returns:
+        List[str]: 与输入顺序一致的排序键
+    """
+    texts = list(texts)
+    _classify_chars(char for text in set(texts) for char in text)
+    return [collation_key(text) for text in texts]
+
+
+def clear_cache(table: bool = False):
+    """清空排序键缓存（table 为 True 时同时清空字符表）"""
+    collation_key.cache_clear()
+    _convert_han_run.cache_clear()
+    _has_phrase_exception.cache_clear()
+    if table:
+        with _table_lock:
+            _char_table.clear()
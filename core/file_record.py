@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+文件分析记录
+使用 __slots__ 的紧凑记录代替每个文件一个字典，并提供与字典兼容的访问方式，
+界面组件、索引和命令行仍可以按 file_info['key'] / file_info.get('key') 读写
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+class FileRecord:
+    """单个音频文件的分析记录"""
+
+    __slots__ = (
+        'original_name', 'has_prefix', 'prefix_number', 'clean_name', 'pinyin_key',
+        'suggested_name', 'status', 'size', 'created_time', 'modified_time', 'inode',
+        # GenAI相关字段
+        'genai_analysis', 'llm_suggested_name', 'needs_genai_analysis'
+    )
+
+    def __init__(self, original_name: str, size: int = 0, created_time: float = 0,
+                 modified_time: float = 0, inode: int = 0):
+        self.original_name = original_name
+        self.has_prefix = False
+        self.prefix_number: Optional[int] = None
+        self.clean_name = ''
+        self.pinyin_key = ''
+        self.suggested_name = ''
+        self.status = 'ok'
+        self.size = size
+        self.created_time = created_time
+        self.modified_time = modified_time
+        self.inode = inode
+        self.genai_analysis: Optional[Dict] = None
+        self.llm_suggested_name: Optional[str] = None
+        self.needs_genai_analysis = False
+
+    # 与字典兼容的访问方式
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def values(self) -> List[Any]:
+        return [getattr(self, key) for key in self.__slots__]
+
+    def items(self) -> List[tuple]:
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（用于序列化）"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FileRecord):
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FileRecord({self.to_dict()!r})"
+
+
+def argsort_numbers(values: Sequence[float], reverse: bool = False) -> List[int]:
+    """
+    对数值列（文件大小、时间）做稳定的间接排序
+
+    安装了 NumPy 时使用向量化的 argsort，否则退回内置排序；
+    两种方式对相等值保持原有顺序，结果与 list.sort(reverse=reverse) 一致。
+
+    Returns:
+        List[int]: 排序后的下标
+    """
+    if len(values) > 1:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        if numpy is not None:
+            column = numpy.asarray(values)
+            if column.dtype.kind in 'if':
+                # 降序时对取负后的值升序排序，相等值仍保持原有顺序
+                return numpy.argsort(-column if reverse else column, kind='stable').tolist()
+
+    return sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
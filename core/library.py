@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+音乐库模式
+递归遍历根目录，把每个包含音频文件的文件夹作为独立的编号单元，
+在线程池中并行分析各个文件夹，并汇总为一份报告
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.progress import ProgressAggregator
+
+
+@dataclass
+class FolderReport:
+    """单个文件夹的分析摘要"""
+    folder_path: str
+    total_files: int = 0
+    needs_rename_count: int = 0
+    needs_renaming: bool = False
+    has_gaps: bool = False
+    duplicate_numbers: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class LibraryReport:
+    """音乐库的汇总分析报告"""
+    root_path: str
+    folders: List[FolderReport] = field(default_factory=list)  # 按路径排序
+    results: Dict[str, Dict] = field(default_factory=dict)  # 文件夹路径 -> 完整分析结果，用于重命名
+
+    @property
+    def folder_count(self) -> int:
+        return len(self.folders)
+
+    @property
+    def total_files(self) -> int:
+        return sum(folder.total_files for folder in self.folders)
+
+    @property
+    def needs_rename_count(self) -> int:
+        return sum(folder.needs_rename_count for folder in self.folders)
+
+    @property
+    def folders_needing_rename(self) -> List[str]:
+        return [folder.folder_path for folder in self.folders if folder.needs_rename_count > 0]
+
+    @property
+    def errors(self) -> List[str]:
+        return [f"{folder.folder_path}: {folder.error}" for folder in self.folders if folder.error]
+
+
+def find_audio_folders(root_path: str, extensions: Iterable[str]) -> List[str]:
+    """
+    查找根目录下所有直接包含音频文件的文件夹（包括根目录本身）
+
+    隐藏文件夹和符号链接指向的文件夹会被跳过，避免重复统计和循环遍历。
+
+    Returns:
+        List[str]: 按路径排序的文件夹列表
+    """
+    extensions = extensions if isinstance(extensions, (set, frozenset)) else set(extensions)
+    folders = []
+    stack = [root_path]
+
+    while stack:
+        folder_path = stack.pop()
+        has_audio = False
+
+        try:
+            with os.scandir(folder_path) as iterator:
+                for item in iterator:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            if not item.name.startswith('.'):
+                                stack.append(item.path)
+                            continue
+                    except OSError:
+                        continue
+
+                    if not has_audio and os.path.splitext(item.name)[1].lower() in extensions:
+                        has_audio = True
+        except OSError:
+            continue
+
+        if has_audio:
+            folders.append(folder_path)
+
+    folders.sort()
+    return folders
+
+
+class LibraryAnalyzer:
+    """音乐库分析器"""
+
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, audio_manager, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        初始化音乐库分析器
+
+        Args:
+            audio_manager: AudioFileManager 实例，各文件夹共享其索引、缓存和LLM连接
+            max_workers: 同时分析的文件夹数量（同时进行的LLM请求数量仍受 max_concurrency 配置限制）
+        """
+        self.audio_manager = audio_manager
+        self.max_workers = max(1, max_workers)
+
+    def analyze_library(self, root_path: str, sort_method: str = "文件名称 (A-Z)",
+                        progress_callback=None, numbering: Optional[str] = None) -> LibraryReport:
+        """
+        分析音乐库中的所有文件夹
+
+        Args:
+            root_path: 音乐库根目录
+            sort_method: 排序方式
+            progress_callback: 进度回调，参数为 (进度百分比, 消息, 已完成数量, 总数)
+            numbering: 编号方式（默认: 与 AudioFileManager 的默认值一致）
+
+        Returns:
+            LibraryReport: 汇总报告
+        """
+        progress_callback = ProgressAggregator.wrap(progress_callback)
+        if numbering is None:
+            numbering = self.audio_manager.NUMBERING_SEQUENTIAL
+
+        if progress_callback:
+            progress_callback(0, "查找音频文件夹...")
+
+        folders = find_audio_folders(root_path, self.audio_manager.AUDIO_EXTENSIONS)
+        report = LibraryReport(root_path=root_path)
+        folder_reports = {}
+
+        if progress_callback:
+            progress_callback(5, f"发现 {len(folders)} 个音频文件夹")
+
+        def analyze_folder(folder_path: str) -> Dict:
+            return self.audio_manager.analyze_files(folder_path, sort_method, numbering=numbering)
+
+        total = len(folders)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, total))) as executor:
+            futures = {executor.submit(analyze_folder, folder_path): folder_path for folder_path in folders}
+
+            for completed, future in enumerate(as_completed(futures), 1):
+                folder_path = futures[future]
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    folder_reports[folder_path] = FolderReport(folder_path, error=str(e))
+                else:
+                    report.results[folder_path] = analysis
+                    folder_reports[folder_path] = FolderReport(
+                        folder_path=folder_path,
+                        total_files=analysis['total_files'],
+                        needs_rename_count=analysis['needs_rename_count'],
+                        needs_renaming=analysis['needs_renaming'],
+                        has_gaps=analysis['has_gaps'],
+                        duplicate_numbers=analysis['duplicate_numbers']
+                    )
+
+                if progress_callback:
+                    progress = 5 + int((completed / total) * 95)
+                    progress_callback(progress, f"分析文件夹: {folder_path}", completed, total)
+
+        report.folders = [folder_reports[folder_path] for folder_path in folders]
+
+        if progress_callback:
+            progress_callback(100, "音乐库分析完成！")
+
+        return report
+
+    def rename_library(self, report: LibraryReport, folders: Optional[Iterable[str]] = None,
+                       progress_callback=None) -> Dict[str, Tuple[int, List[str]]]:
+        """
+        按分析报告重命名音乐库中的文件
+
+        各文件夹的重命名互不影响，同样在线程池中并行执行。
+
+        Args:
+            report: analyze_library 返回的报告
+            folders: 需要重命名的文件夹（默认: 所有需要重命名的文件夹）
+            progress_callback: 进度回调，参数为 (进度百分比, 消息, 已完成数量, 总数)
+
+        Returns:
+            Dict[str, Tuple[int, List[str]]]: 文件夹路径 -> (成功数量, 错误信息列表)
+        """
+        progress_callback = ProgressAggregator.wrap(progress_callback)
+        folders = list(folders) if folders is not None else report.folders_needing_rename
+        results = {}
+
+        if progress_callback:
+            progress_callback(0, "开始重命名音乐库...")
+
+        def rename_folder(folder_path: str) -> Tuple[int, List[str]]:
+            analysis = report.results.get(folder_path)
+            if analysis is None:
+                return 0, [f"{folder_path}: 没有分析结果"]
+            file_mappings = self.audio_manager.get_rename_mappings(analysis)
+            return self.audio_manager.rename_files(folder_path, file_mappings)
+
+        total = len(folders)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, total))) as executor:
+            futures = {executor.submit(rename_folder, folder_path): folder_path for folder_path in folders}
+
+            for completed, future in enumerate(as_completed(futures), 1):
+                folder_path = futures[future]
+                try:
+                    results[folder_path] = future.result()
+                except Exception as e:
+                    results[folder_path] = (0, [f"重命名过程出错: {str(e)}"])
+
+                if progress_callback:
+                    progress = int((completed / total) * 100)
+                    progress_callback(progress, f"重命名文件夹: {folder_path}", completed, total)
+
+        if progress_callback:
+            progress_callback(100, "音乐库重命名完成！")
+
+        return results
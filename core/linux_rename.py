@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Linux重命名后端
+通过 renameat2 系统调用在文件夹的文件描述符上执行重命名：
+RENAME_NOREPLACE 保证不会覆盖已存在的文件，RENAME_EXCHANGE 原子地交换两个文件名
+"""
+
+import ctypes
+import errno
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+RENAME_NOREPLACE = 1 << 0
+RENAME_EXCHANGE = 1 << 1
+
+# 文件系统（st_dev）-> 是否支持 renameat2 的标志，每个文件系统只试验一次
+_probe_results: Dict[int, bool] = {}
+_probe_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _load_renameat2():
+    """加载libc中的 renameat2，不可用时返回None（需要 glibc 2.28 以上）"""
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return None
+
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    return renameat2
+
+
+def is_supported() -> bool:
+    """检查系统是否提供 renameat2（不检查具体文件系统是否支持）"""
+    return _load_renameat2() is not None
+
+
+class LinuxRenamer:
+    """基于 renameat2 的文件夹内重命名"""
+
+    PROBE_PREFIX = ".music_manager_probe_"
+
+    def __init__(self, folder_path: str):
+        """
+        打开文件夹的文件描述符，之后的重命名都相对于该描述符进行，不再重复解析文件夹路径
+
+        Args:
+            folder_path: 执行重命名的文件夹
+
+        Raises:
+            OSError: 系统不支持 renameat2 或无法打开文件夹
+        """
+        self._renameat2 = _load_renameat2()
+        if self._renameat2 is None:
+            raise OSError(errno.ENOSYS, "renameat2 不可用")
+
+        self.folder_path = folder_path
+        self.dir_fd = os.open(folder_path, os.O_RDONLY | os.O_DIRECTORY)
+
+    def rename(self, source: str, target: str):
+        """
+        重命名文件，目标名称已存在时抛出 FileExistsError 而不是覆盖
+        """
+        self._call(source, target, RENAME_NOREPLACE)
+
+    def exchange(self, first: str, second: str):
+        """原子地交换两个文件名"""
+        self._call(first, second, RENAME_EXCHANGE)
+
+    def _call(self, source: str, target: str, flags: int):
+        """调用 renameat2，失败时抛出对应的 OSError 子类"""
+        result = self._renameat2(self.dir_fd, os.fsencode(source), self.dir_fd, os.fsencode(target), flags)
+        if result != 0:
+            error_code = ctypes.get_errno()
+            raise OSError(error_code, os.strerror(error_code), source, None, target)
+
+    def is_filesystem_supported(self) -> bool:
+        """
+        检查文件夹所在的文件系统是否支持 renameat2 的标志
+
+        试验结果按文件系统（st_dev）缓存，音乐库中同一文件系统上的文件夹不再重复创建试验文件。
+        """
+        device = os.fstat(self.dir_fd).st_dev
+        with _probe_lock:
+            supported = _probe_results.get(device)
+        if supported is None:
+            supported = self.probe()
+            with _probe_lock:
+                _probe_results[device] = supported
+        return supported
+
+    def probe(self) -> bool:
+        """
+        检查文件夹所在的文件系统是否支持 RENAME_NOREPLACE 和 RENAME_EXCHANGE
+
+        部分文件系统（如一些网络文件系统）不支持这些标志，只能在实际调用时发现，
+        因此用两个隐藏的空文件试验一次。
+        """
+        first = f"{self.PROBE_PREFIX}{os.getpid()}_a"
+        second = f"{self.PROBE_PREFIX}{os.getpid()}_b"
+        moved = f"{self.PROBE_PREFIX}{os.getpid()}_c"
+        created = []
+
+        try:
+            for name in (first, second):
+                fd = os.open(name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, dir_fd=self.dir_fd)
+                os.close(fd)
+                created.append(name)
+
+            self.exchange(first, second)
+            self.rename(first, moved)
+            created[0] = moved
+            return True
+        except OSError:
+            return False
+        finally:
+            for name in created:
+                try:
+                    os.unlink(name, dir_fd=self.dir_fd)
+                except OSError:
+                    pass
+
+    def close(self):
+        """关闭文件夹的文件描述符"""
+        if self.dir_fd is not None:
+            os.close(self.dir_fd)
+            self.dir_fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def create_renamer(folder_path: str) -> Optional[LinuxRenamer]:
+    """
+    创建文件夹的重命名后端
+
+    Returns:
+        Optional[LinuxRenamer]: 系统和文件系统都支持 renameat2 时返回后端实例，否则返回None
+    """
+    try:
+        renamer = LinuxRenamer(folder_path)
+    except OSError:
+        return None
+
+    if not renamer.is_filesystem_supported():
+        renamer.close()
+        return None
+    return renamer
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+文件元数据并发读取
+在 SMB/NFS 等网络挂载上每次 stat 都需要一次网络往返，逐个读取时大文件夹要等待很久。
+这里按挂载点使用有上限的线程池并发执行 stat，并统计每次调用的耗时，
+便于用户根据实际延迟选择并发数
+
+并发数按挂载点配置（scan_config.json）:
+    {
+        "default_workers": 1,
+        "network_workers": 16,
+        "mounts": {"/mnt/nas": 32, "/media/vpn-share": 8}
+    }
+未配置的挂载点按文件系统类型选择：网络文件系统使用 network_workers，其它使用 default_workers
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+# 视为网络文件系统的挂载类型
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'ncpfs', '9p',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.gvfsd-fuse', 'davfs', 'fuse.davfs2'
+}
+
+
+@dataclass
+class ScanConfig:
+    """元数据读取配置"""
+    default_workers: int = 1  # 本地磁盘：stat 很快，逐个读取即可
+    network_workers: int = 16  # 未单独配置的网络挂载
+    mounts: Dict[str, int] = field(default_factory=dict)  # 挂载点路径 -> 并发数
+
+
+def load_scan_config(config_path: Optional[Path] = None) -> ScanConfig:
+    """读取元数据读取配置，文件不存在或损坏时返回默认配置"""
+    config_path = config_path or Path.cwd() / "scan_config.json"
+    if not config_path.exists():
+        return ScanConfig()
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        mounts = {
+            os.path.normpath(os.path.expanduser(path)): max(1, int(workers))
+            for path, workers in data.get('mounts', {}).items()
+        }
+        return ScanConfig(
+            default_workers=max(1, int(data.get('default_workers', 1))),
+            network_workers=max(1, int(data.get('network_workers', 16))),
+            mounts=mounts
+        )
+    except Exception:
+        return ScanConfig()
+
+
+@lru_cache(maxsize=1)
+def _read_mount_table() -> Tuple[Tuple[str, str], ...]:
+    """读取系统挂载表，返回按路径长度降序排列的 (挂载点, 文件系统类型)；不支持时返回空"""
+    mounts = []
+    try:
+        with open('/proc/self/mounts', 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3:
+                    # 挂载表中的空格等字符以八进制转义
+                    mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), parts[1])
+                    mounts.append((mount_point, parts[2]))
+    except OSError:
+        return ()
+    mounts.sort(key=lambda item: len(item[0]), reverse=True)
+    return tuple(mounts)
+
+
+def _is_under(path: str, mount_point: str) -> bool:
+    """判断路径是否位于挂载点之下"""
+    if mount_point == os.sep:
+        return True
+    return path == mount_point or path.startswith(mount_point.rstrip(os.sep) + os.sep)
+
+
+@dataclass
+class LatencyStats:
+    """单个挂载点的 stat 耗时统计（秒）"""
+    mount_point: str
+    workers: int
+    count: int = 0
+    errors: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    samples: deque = field(default_factory=lambda: deque(maxlen=2048))  # 最近的耗时样本
+
+    def add(self, elapsed: float, ok: bool):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.samples.append(elapsed)
+        if not ok:
+            self.errors += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """最近样本的分位数"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        """转换为便于显示和输出的字典（耗时单位：毫秒）"""
+        return {
+            'mount_point': self.mount_point,
+            'workers': self.workers,
+            'calls': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.mean * 1000, 3),
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class MetadataFetcher:
+    """按挂载点限制并发的 stat 执行器"""
+
+    def __init__(self, config: Optional[ScanConfig] = None, max_workers: Optional[int] = None):
+        """
+        初始化元数据读取器
+
+        Args:
+            config: 读取配置（默认: 从 scan_config.json 读取）
+            max_workers: 对所有挂载点强制使用的并发数（默认: 按配置决定），便于测试不同并发数的效果
+        """
+        self.config = config or load_scan_config()
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        # 同一挂载点的所有文件夹共用一个线程池，音乐库模式下并发分析多个文件夹时总并发数仍受限。
+        # 按 (挂载点, 并发数) 保存：并发数变化后其它文件夹可能仍在使用原线程池，运行期间不关闭
+        self._executors: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+        self._stats: Dict[Tuple[str, int], LatencyStats] = {}
+
+    def resolve_mount(self, folder_path: str) -> Tuple[str, int]:
+        """
+        确定文件夹所在的挂载点及其并发数
+
+        优先使用配置中路径最长的匹配项，其次根据系统挂载表判断是否为网络文件系统；
+        设置了 max_workers 时所有挂载点都使用该并发数。
+
+        Returns:
+            Tuple[str, int]: (挂载点, 并发数)
+        """
+        path = os.path.normpath(os.path.abspath(folder_path))
+        mount_point, workers = self._resolve_configured_mount(path)
+        if self.max_workers is not None:
+            workers = max(1, self.max_workers)
+        return mount_point, workers
+
+    def _resolve_configured_mount(self, path: str) -> Tuple[str, int]:
+        """按配置文件和系统挂载表确定挂载点及其并发数"""
+        configured = [mount for mount in self.config.mounts if _is_under(path, mount)]
+        if configured:
+            mount_point = max(configured, key=len)
+            return mount_point, self.config.mounts[mount_point]
+
+        for mount_point, fs_type in _read_mount_table():
+            if _is_under(path, mount_point):
+                if fs_type in NETWORK_FILESYSTEMS:
+                    return mount_point, self.config.network_workers
+                return mount_point, self.config.default_workers
+
+        return os.sep, self.config.default_workers
+
+    def stat_paths(self, paths: Sequence[Union[str, os.DirEntry]],
+                   folder_path: Optional[str] = None) -> List[Optional[os.stat_result]]:
+        """
+        读取一组文件的元数据
+
+        Args:
+            paths: 文件路径或 os.scandir 得到的目录项（目录项自带缓存的元数据时不会再访问文件系统）
+            folder_path: 文件所在的文件夹（默认: 第一个文件的上级目录），用于确定挂载点
+
+        Returns:
+            List[Optional[os.stat_result]]: 与 paths 顺序一致的结果，读取失败的项为 None
+        """
+        if not paths:
+            return []
+
+        if folder_path is None:
+            first = paths[0] if isinstance(paths[0], str) else paths[0].path
+            folder_path = os.path.dirname(first) or os.curdir
+        mount_point, workers = self.resolve_mount(folder_path)
+        stats = self._get_stats(mount_point, workers)
+        results = self._map(self._timed_stat, paths, mount_point, workers)
+
+        with self._lock:
+            for _, elapsed, ok in results:
+                stats.add(elapsed, ok)
+        return [result for result, _, _ in results]
+
+    def map_paths(self, function: Callable[[str], T], paths: Sequence[str], folder_path: str) -> List[T]:
+        """
+        在文件夹所在挂载点的线程池中对每个文件执行 function（如读取文件标签）
+
+        Returns:
+            List: 与 paths 顺序一致的结果
+        """
+        if not paths:
+            return []
+        mount_point, workers = self.resolve_mount(folder_path)
+        return self._map(function, paths, mount_point, workers)
+
+    def _map(self, function: Callable, items: Sequence, mount_point: str, workers: int) -> List:
+        if workers <= 1 or len(items) == 1:
+            return [function(item) for item in items]
+        return list(self._get_executor(mount_point, workers).map(function, items))
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """读取单个文件的元数据，失败时返回None"""
+        return self.stat_paths([path])[0]
+
+    def get_latency_stats(self) -> List[Dict]:
+        """获取各挂载点（及并发数）观测到的 stat 耗时统计"""
+        with self._lock:
+            return [stats.to_dict() for stats in self._stats.values() if stats.count]
+
+    def reset_stats(self):
+        """清空耗时统计"""
+        with self._lock:
+            self._stats.clear()
+
+    def _get_stats(self, mount_point: str, workers: int) -> LatencyStats:
+        # 按 (挂载点, 并发数) 分别统计，便于比较不同并发数下的耗时
+        with self._lock:
+            stats = self._stats.get((mount_point, workers))
+            if stats is None:
+                stats = self._stats[(mount_point, workers)] = LatencyStats(mount_point, workers)
+            return stats
+
+    def _get_executor(self, mount_point: str, workers: int) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get((mount_point, workers))
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stat")
+                self._executors[(mount_point, workers)] = executor
+            return executor
+
+    def close(self):
+        """关闭所有线程池（调用前需确保没有正在进行的读取）"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _timed_stat(path: Union[str, os.DirEntry]) -> Tuple[Optional[os.stat_result], float, bool]:
+        start = time.perf_counter()
+        try:
+            result = os.stat(path) if isinstance(path, str) else path.stat()
+            ok = True
+        except OSError:
+            result = None
+            ok = False
+        return result, time.perf_counter() - start, ok
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+重命名日志
+在执行重命名前写入完整的重命名计划，并在执行过程中记录进度（批量fsync），
+用于进程中断后的恢复以及撤销上一次重命名
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .rename_planner import RenameOperation
+
+
+@dataclass
+class JournalState:
+    """从日志中读取的重命名状态"""
+    operations: List[RenameOperation] = field(default_factory=list)
+    succeeded: Set[int] = field(default_factory=set)  # 已记录成功的操作序号
+    recorded: Set[int] = field(default_factory=set)  # 已记录结果（成功或失败）的操作序号
+    exchange_inodes: Dict[int, int] = field(default_factory=dict)  # 交换操作执行前原名称对应的inode
+    complete: bool = False
+    created: float = 0
+
+
+class RenameJournal:
+    """文件夹内的重命名预写日志"""
+
+    JOURNAL_FILE = ".music_manager_rename.journal"
+    FSYNC_INTERVAL = 32  # 每记录多少次操作同步一次磁盘
+
+    def __init__(self, folder_path: str):
+        """
+        初始化重命名日志
+
+        Args:
+            folder_path: 执行重命名的文件夹
+        """
+        self.folder_path = folder_path
+        self.journal_path = os.path.join(folder_path, self.JOURNAL_FILE)
+        self._file = None
+        self._unsynced = 0
+        self._operation_count = 0
+
+    def exists(self) -> bool:
+        """检查文件夹中是否有重命名日志"""
+        return os.path.exists(self.journal_path)
+
+    def begin(self, operations: List[RenameOperation]):
+        """
+        写入重命名计划，并在任何重命名开始前同步到磁盘
+
+        先写入临时文件再原子替换，旧的日志在新计划落盘前始终保持完整。
+        交换操作前后两个文件名都存在，无法从文件名判断是否已执行，因此额外记录原名称的inode。
+
+        Args:
+            operations: 按执行顺序排列的重命名操作
+        """
+        temp_path = self.journal_path + ".tmp"
+        header = {
+            "type": "plan",
+            "created": time.time(),
+            "operations": [self._format_operation(operation) for operation in operations]
+        }
+
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+        self._fsync_folder()
+
+        self._operation_count = len(operations)
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        self._unsynced = 0
+
+    def _format_operation(self, operation: RenameOperation) -> list:
+        """把重命名操作转换为日志中的 [原名称, 新名称, 是否临时名称, 是否交换, inode]"""
+        if not operation.exchange:
+            return [operation.source, operation.target, operation.to_temp]
+
+        try:
+            inode = os.lstat(os.path.join(self.folder_path, operation.source)).st_ino
+        except OSError:
+            inode = 0
+        return [operation.source, operation.target, operation.to_temp, True, inode]
+
+    def record(self, index: int, success: bool):
+        """
+        记录一次操作的结果
+
+        Args:
+            index: 操作序号
+            success: 是否成功
+        """
+        self._write({"type": "done", "index": index, "ok": success})
+
+    def record_extra(self, source: str, target: str):
+        """记录计划之外的补救操作（例如把临时名称恢复为原文件名）"""
+        self._write({"type": "extra", "index": self._operation_count, "operation": [source, target]})
+        self._operation_count += 1
+
+    def commit(self):
+        """标记全部操作已执行完毕并关闭日志"""
+        self._write({"type": "complete"})
+        self.sync()
+        self.close()
+
+    def sync(self):
+        """把已记录的进度同步到磁盘"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        """关闭日志文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: dict):
+        """追加一条记录，累计到一定数量后同步磁盘"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.FSYNC_INTERVAL:
+            self.sync()
+
+    def _fsync_folder(self):
+        """同步文件夹元数据，确保日志文件本身已落盘"""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        try:
+            fd = os.open(self.folder_path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def load(self) -> Optional[JournalState]:
+        """
+        读取日志
+
+        Returns:
+            Optional[JournalState]: 日志状态，日志不存在或计划不完整时返回None
+        """
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+
+        state = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 中断时最后一行可能只写了一半
+                continue
+
+            record_type = record.get("type")
+            if record_type == "plan":
+                items = record.get("operations", [])
+                state = JournalState(
+                    operations=[self._parse_operation(item) for item in items],
+                    exchange_inodes={
+                        index: item[4] for index, item in enumerate(items) if len(item) > 4 and item[4]
+                    },
+                    created=record.get("created", 0)
+                )
+            elif state is None:
+                continue
+            elif record_type == "done":
+                state.recorded.add(record["index"])
+                if record.get("ok"):
+                    state.succeeded.add(record["index"])
+            elif record_type == "extra":
+                state.operations.append(self._parse_operation(record["operation"]))
+                state.recorded.add(record["index"])
+                state.succeeded.add(record["index"])
+            elif record_type == "complete":
+                state.complete = True
+
+        return state
+
+    @staticmethod
+    def _parse_operation(item: list) -> RenameOperation:
+        """把日志中的操作记录转换为重命名操作"""
+        return RenameOperation(
+            item[0], item[1],
+            to_temp=bool(item[2]) if len(item) > 2 else False,
+            exchange=bool(item[3]) if len(item) > 3 else False
+        )
+
+    def get_completed_operations(self, state: JournalState) -> List[RenameOperation]:
+        """
+        确定已经执行的操作
+
+        日志中的进度是批量同步的，中断时末尾的一批操作可能已执行但未记录。
+        操作严格按顺序执行，未记录的操作中已执行的一定是开头的一段：
+        从最长的一段开始，在当前文件名集合上逆向模拟还原，
+        每一步都要求新名称存在且原名称不存在（交换操作则要求两个名称都存在且inode已互换），
+        第一个能完整还原的长度即为已执行的数量。
+
+        Returns:
+            List[RenameOperation]: 按执行顺序排列的已执行操作
+        """
+        completed = []
+        unrecorded = []
+        for index, operation in enumerate(state.operations):
+            if index not in state.recorded:
+                unrecorded.append((index, operation))
+            elif index in state.succeeded:
+                completed.append(operation)
+
+        if not unrecorded:
+            return completed
+
+        try:
+            current_names = set(os.listdir(self.folder_path))
+        except OSError:
+            return completed
+
+        for count in range(len(unrecorded), 0, -1):
+            names = set(current_names)
+            for index, operation in reversed(unrecorded[:count]):
+                if operation.exchange:
+                    if (operation.source not in names or operation.target not in names
+                            or not self._is_exchanged(state, index, operation)):
+                        break
+                    continue
+                if operation.target not in names or operation.source in names:
+                    break
+                names.discard(operation.target)
+                names.add(operation.source)
+            else:
+                return completed + [operation for _, operation in unrecorded[:count]]
+
+        return completed
+
+    def _is_exchanged(self, state: JournalState, index: int, operation: RenameOperation) -> bool:
+        """根据原名称当前对应的inode判断交换操作是否已执行"""
+        inode = state.exchange_inodes.get(index)
+        if not inode:
+            return False
+        try:
+            return os.lstat(os.path.join(self.folder_path, operation.source)).st_ino != inode
+        except OSError:
+            return False
+
+    @staticmethod
+    def invert_operations(completed: List[RenameOperation]) -> List[RenameOperation]:
+        """
+        生成撤销已执行操作的逆向操作
+
+        逆向操作按相反顺序执行，每个操作只需一次重命名，总次数与正向执行相同。
+        """
+        temp_names = {operation.target for operation in completed if operation.to_temp}
+        return [
+            RenameOperation(operation.target, operation.source,
+                            to_temp=operation.source in temp_names, exchange=operation.exchange)
+            for operation in reversed(completed)
+        ]
+
+    def remove(self):
+        """删除日志"""
+        try:
+            os.remove(self.journal_path)
+        except OSError:
+            pass
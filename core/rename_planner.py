@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+重命名计划
+根据新旧文件名之间的依赖关系安排重命名顺序：目标名称空闲的文件直接重命名，
+只有真正形成循环的文件才借助临时文件名
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+
+@dataclass
+class RenameOperation:
+    """单次重命名操作"""
+    source: str
+    target: str
+    to_temp: bool = False  # 是否为打破循环而移动到临时名称
+    exchange: bool = False  # 是否原子地交换两个文件名（source 和 target 互换）
+
+
+@dataclass
+class RenamePlan:
+    """重命名计划"""
+    operations: List[RenameOperation] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)  # 无法执行的重命名及原因
+    file_count: int = 0  # 计划重命名的文件数量
+    temp_count: int = 0  # 为打破循环使用的临时文件名数量
+
+    @property
+    def two_phase_count(self) -> int:
+        """两阶段重命名（每个文件先改为临时名称再改为最终名称）需要的操作次数"""
+        return self.file_count * 2
+
+    @property
+    def saved_operations(self) -> int:
+        """相比两阶段重命名节省的操作次数"""
+        return self.two_phase_count - len(self.operations)
+
+
+def plan_renames(file_mappings: Dict[str, str], existing_names: Iterable[str],
+                 temp_prefix: str = "__temp__", use_exchange: bool = False) -> RenamePlan:
+    """
+    生成重命名计划
+
+    Args:
+        file_mappings: 原文件名到新文件名的映射
+        existing_names: 文件夹中当前存在的全部文件名
+        temp_prefix: 临时文件名前缀
+        use_exchange: 两个文件互换名称时是否使用一次交换操作代替临时文件名
+
+    Returns:
+        RenamePlan: 按执行顺序排列的重命名操作
+    """
+    plan = RenamePlan()
+    existing = set(existing_names)
+
+    # 过滤无需重命名和源文件不存在的映射，检查目标名称重复
+    moves = {}
+    target_owner = {}
+    for source, target in file_mappings.items():
+        if source == target:
+            continue
+        if source not in existing:
+            plan.conflicts.append(f"重命名 {source} 失败: 源文件不存在")
+            continue
+        if target in target_owner:
+            plan.conflicts.append(f"重命名 {source} 失败: 目标名称 {target} 与 {target_owner[target]} 重复")
+            continue
+        target_owner[target] = source
+        moves[source] = target
+
+    # 目标名称被不参与重命名的文件占用时无法执行；排除后可能产生新的占用，需要反复检查
+    changed = True
+    while changed:
+        changed = False
+        for source, target in list(moves.items()):
+            if target in existing and target not in moves:
+                plan.conflicts.append(f"重命名 {source} 失败: 目标文件 {target} 已存在")
+                del moves[source]
+                changed = True
+
+    plan.file_count = len(moves)
+
+    occupied = set(existing)
+    # 等待某个名称被腾出的操作：被占用的名称 -> 想要使用该名称的源文件
+    waiting = {target: source for source, target in moves.items() if target in occupied}
+    ready = [source for source, target in moves.items() if target not in occupied]
+    pending = dict(moves)
+
+    def run_ready():
+        while ready:
+            source = ready.pop()
+            target = pending.pop(source)
+            plan.operations.append(RenameOperation(source, target))
+            occupied.discard(source)
+            occupied.add(target)
+
+            # 腾出的名称可以让等待它的操作执行
+            next_source = waiting.pop(source, None)
+            if next_source is not None:
+                ready.append(next_source)
+
+    run_ready()
+
+    # 剩余的操作都处于循环中：把循环中的一个文件移到临时名称以打破循环
+    while pending:
+        source = next(iter(pending))
+        target = pending.pop(source)
+
+        # 两个文件互换名称时直接交换，双方的名称都保持占用
+        if use_exchange and pending.get(target) == source:
+            del pending[target]
+            waiting.pop(source, None)
+            waiting.pop(target, None)
+            plan.operations.append(RenameOperation(source, target, exchange=True))
+            continue
+
+        temp_index = plan.temp_count
+        temp_name = f"{temp_prefix}{temp_index}__{target}"
+        while temp_name in occupied:
+            temp_index += 1
+            temp_name = f"{temp_prefix}{temp_index}__{target}"
+        plan.temp_count += 1
+
+        plan.operations.append(RenameOperation(source, temp_name, to_temp=True))
+        occupied.discard(source)
+        occupied.add(temp_name)
+
+        # 临时文件等待循环中其它文件腾出目标名称
+        pending[temp_name] = target
+        waiting[target] = temp_name
+
+        next_source = waiting.pop(source, None)
+        if next_source is not None:
+            ready.append(next_source)
+        run_ready()
+
+    return plan
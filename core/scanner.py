@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+音频文件扫描器
+基于 os.scandir 单次遍历文件夹，同时完成扩展名过滤、文件类型判断和元数据读取
+"""
+
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .metadata_fetcher import MetadataFetcher
+
+
+@dataclass
+class AudioFileEntry:
+    """扫描得到的音频文件记录"""
+    name: str
+    path: str
+    size: int = 0
+    created_time: float = 0
+    modified_time: float = 0
+    inode: int = 0
+
+
+def scan_audio_files(folder_path: str, extensions: Iterable[str],
+                     fetcher: Optional["MetadataFetcher"] = None) -> List[AudioFileEntry]:
+    """
+    扫描文件夹中的音频文件
+
+    每个目录项只做一次扩展名判断；文件类型优先使用目录项自带的类型信息，
+    每个音频文件最多调用一次 stat。目录遍历完成后再统一读取元数据，
+    提供 fetcher 时按所在挂载点的并发数并行读取。
+
+    Args:
+        folder_path: 文件夹路径
+        extensions: 允许的扩展名集合（小写，包含点号）
+        fetcher: 元数据读取器（默认: 在当前线程中逐个读取）
+
+    Returns:
+        List[AudioFileEntry]: 音频文件记录列表（目录遍历顺序）
+    """
+    extensions = extensions if isinstance(extensions, (set, frozenset)) else set(extensions)
+    items = []
+
+    try:
+        with os.scandir(folder_path) as iterator:
+            for item in iterator:
+                # 先做最廉价的扩展名过滤，避免对非音频文件做任何系统调用
+                ext = os.path.splitext(item.name)[1].lower()
+                if ext not in extensions:
+                    continue
+
+                try:
+                    if not item.is_file():
+                        continue
+                except OSError:
+                    continue
+
+                items.append(item)
+    except OSError:
+        return []
+
+    if fetcher is not None:
+        stats = fetcher.stat_paths(items, folder_path)
+    else:
+        stats = [_stat_entry(item) for item in items]
+
+    entries = []
+    for item, stat in zip(items, stats):
+        if stat is None:
+            # 无法读取元数据时沿用旧逻辑，记为零值
+            entries.append(AudioFileEntry(name=item.name, path=item.path))
+            continue
+
+        entries.append(AudioFileEntry(
+            name=item.name,
+            path=item.path,
+            size=stat.st_size,
+            created_time=stat.st_ctime,
+            modified_time=stat.st_mtime,
+            inode=stat.st_ino
+        ))
+
+    return entries
+
+
+def _stat_entry(item: os.DirEntry) -> Optional[os.stat_result]:
+    """读取目录项的元数据，失败时返回None"""
+    try:
+        return item.stat()
+    except OSError:
+        return None
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+音频标签读取器
+只读取文件头部的标签结构，支持 ID3v2（MP3 等）、FLAC/OGG/Opus 的 Vorbis 注释和 MP4 (M4A) 的 ilst 元数据。
+遇到封面图片等不需要的数据块时直接跳过，每个文件通常只读取几 KB
+"""
+
+import os
+import re
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional
+
+# 单个文本字段或注释块最多读取的字节数，超出部分（通常是内嵌图片）被忽略
+MAX_FIELD_BYTES = 64 * 1024
+# OGG 注释包最多读取的页数
+MAX_OGG_PAGES = 16
+
+# 标签中的语言代码 -> 文件命名使用的语言
+LANGUAGE_ALIASES = {
+    '国语': '国语', '普通话': '国语', '华语': '国语', '中文': '国语', '汉语': '国语',
+    'chi': '国语', 'zho': '国语', 'zh': '国语', 'cmn': '国语', 'chinese': '国语', 'mandarin': '国语',
+    'zh-cn': '国语', 'zh-tw': '国语', 'zh-hans': '国语', 'zh-hant': '国语',
+    '粤语': '粤语', '广东话': '粤语', 'yue': '粤语', 'cantonese': '粤语', 'zh-hk': '粤语',
+    '英语': '英语', '英文': '英语', 'eng': '英语', 'en': '英语', 'english': '英语',
+}
+
+_CJK_PATTERN = re.compile(r'[㐀-鿿]')
+_INVALID_CHARS = re.compile(r'[\x00-\x1f\x7f\\:*?"<>|]')
+
+
+@dataclass
+class AudioTags:
+    """从文件标签中读取的信息"""
+    artist: str = ''
+    title: str = ''
+    language: str = ''  # 已规范化为 国语/粤语/英语，无法识别时为空
+    album_artist: str = ''
+
+    @property
+    def is_complete(self) -> bool:
+        """是否同时包含歌手和歌曲名"""
+        return bool((self.artist or self.album_artist) and self.title)
+
+
+def normalize_language(value: str) -> str:
+    """把标签中的语言代码或名称转换为 国语/粤语/英语，无法识别时返回空字符串"""
+    value = value.strip().lower().replace('_', '-')
+    return LANGUAGE_ALIASES.get(value, '')
+
+
+def read_tags(file_path: str) -> Optional[AudioTags]:
+    """
+    读取音频文件的标签
+
+    根据文件头部的魔数判断标签格式，而不是依赖扩展名。
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        Optional[AudioTags]: 标签信息，文件不含可识别的标签或读取失败时返回None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            fields = _read_fields(f)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if not fields:
+        return None
+
+    def first(key: str) -> str:
+        values = [_clean_value(value) for value in fields.get(key, [])]
+        values = [value for value in values if value]
+        # 多位歌手用 & 连接（ID3v2.3 惯用 / 分隔），交给歌手名处理逻辑拆分
+        if key in ('artist', 'album_artist'):
+            return ' & '.join(value.replace('/', ' & ') for value in values)
+        return values[0].replace('/', ' ') if values else ''
+
+    tags = AudioTags(
+        artist=first('artist'),
+        title=first('title'),
+        language=normalize_language(first('language')),
+        album_artist=first('album_artist')
+    )
+    if not (tags.artist or tags.title or tags.album_artist):
+        return None
+    return tags
+
+
+def _clean_value(value: str) -> str:
+    """去除控制字符，把文件名中不允许的字符（/ 除外，由调用方处理）替换为空格"""
+    value = _INVALID_CHARS.sub(' ', value)
+    return ' '.join(value.split())
+
+
+def _read_fields(f: BinaryIO) -> Dict[str, List[str]]:
+    """按文件头部识别标签格式并读取字段"""
+    head = f.read(12)
+    if head[:3] == b'ID3':
+        f.seek(0)
+        fields = _read_id3v2(f)
+        if fields:
+            return fields
+        # 部分 FLAC 文件在开头带有 ID3v2 标签，跳过后读取 Vorbis 注释（v2.4 可能带有10字节的尾部）
+        tag_size = _synchsafe(head[6:10]) + (20 if head[5] & 0x10 else 10)
+        f.seek(tag_size)
+        if f.read(4) == b'fLaC':
+            return _read_flac(f)
+        return {}
+    if head[:4] == b'fLaC':
+        f.seek(4)
+        return _read_flac(f)
+    if head[:4] == b'OggS':
+        f.seek(0)
+        return _read_ogg(f)
+    if head[4:8] == b'ftyp':
+        f.seek(0)
+        return _read_mp4(f)
+    return {}
+
+
+def _add(fields: Dict[str, List[str]], key: str, value: str):
+    fields.setdefault(key, []).append(value)
+
+
+# ---------------------------------------------------------------- ID3v2
+
+# 帧ID -> 字段名（v2.2 使用三字符ID）
+_ID3_FRAMES = {
+    b'TPE1': 'artist', b'TIT2': 'title', b'TLAN': 'language', b'TPE2': 'album_artist',
+    b'TP1': 'artist', b'TT2': 'title', b'TLA': 'language', b'TP2': 'album_artist',
+}
+
+
+# 文本编码字节 -> 编码（0 为 ISO-8859-1，单独处理）
+_ID3_ENCODINGS = {1: 'utf-16', 2: 'utf-16-be', 3: 'utf-8'}
+
+
+def _synchsafe(data: bytes) -> int:
+    return (data[0] & 0x7f) << 21 | (data[1] & 0x7f) << 14 | (data[2] & 0x7f) << 7 | (data[3] & 0x7f)
+
+
+def _read_id3v2(f: BinaryIO) -> Dict[str, List[str]]:
+    """读取 ID3v2 文本帧，其它帧（如封面图片）直接跳过"""
+    header = f.read(10)
+    if len(header) < 10:
+        return {}
+
+    major, flags = header[3], header[5]
+    if major not in (2, 3, 4):
+        return {}
+    if flags & 0x80 and major < 4:
+        # 整个标签使用了反同步，帧长度需要解码后才能确定，较少见，不做处理
+        return {}
+
+    end = 10 + _synchsafe(header[6:10])
+    position = 10
+    if flags & 0x40 and major >= 3:
+        # 跳过扩展头
+        extended = f.read(4)
+        if len(extended) < 4:
+            return {}
+        position += _synchsafe(extended) if major == 4 else 4 + struct.unpack('>I', extended)[0]
+
+    id_size, header_size = (3, 6) if major == 2 else (4, 10)
+    fields = {}
+
+    while position + header_size <= end:
+        f.seek(position)
+        frame_header = f.read(header_size)
+        if len(frame_header) < header_size or frame_header[0] == 0:
+            # 到达填充区
+            break
+
+        frame_id = frame_header[:id_size]
+        if major == 2:
+            size = int.from_bytes(frame_header[3:6], 'big')
+            format_flags = 0
+        elif major == 3:
+            size = struct.unpack('>I', frame_header[4:8])[0]
+            # v2.3 的压缩和加密标志
+            format_flags = 0x80 if frame_header[9] & 0xc0 else 0
+        else:
+            size = _synchsafe(frame_header[4:8])
+            format_flags = frame_header[9]
+
+        position += header_size + size
+        key = _ID3_FRAMES.get(frame_id)
+        if key is None or size > MAX_FIELD_BYTES:
+            continue
+
+        body = f.read(size)
+        if major == 3 and format_flags & 0x80:
+            continue
+        if major == 4:
+            if format_flags & 0x0c:
+                # 压缩或加密的帧
+                continue
+            if format_flags & 0x02:
+                body = body.replace(b'\xff\x00', b'\xff')
+            if format_flags & 0x01:
+                # 数据长度指示
+                body = body[4:]
+
+        for value in _decode_id3_text(body):
+            _add(fields, key, value)
+
+    return fields
+
+
+def _decode_id3_text(body: bytes) -> List[str]:
+    """解码 ID3 文本帧，返回以空字符分隔的多个值"""
+    if not body:
+        return []
+
+    encoding, data = body[0], body[1:]
+    if encoding == 0:
+        text = _decode_legacy(data.rstrip(b'\x00'))
+    elif encoding in _ID3_ENCODINGS:
+        text = data.decode(_ID3_ENCODINGS[encoding], errors='replace')
+    else:
+        return []
+
+    # 多个值以空字符分隔，UTF-16 的每个值前都可能带有 BOM
+    return [value.lstrip('\ufeff') for value in text.split('\x00') if value.strip('\x00\ufeff ')]
+
+
+def _decode_legacy(data: bytes) -> str:
+    """
+    解码标称为 ISO-8859-1 的文本
+
+    很多中文 MP3 的标签实际使用 GBK 编码却标为 ISO-8859-1，能按 GBK 解码出汉字时使用 GBK。
+    """
+    if any(byte >= 0x80 for byte in data):
+        try:
+            text = data.decode('gbk')
+            if _CJK_PATTERN.search(text):
+                return text
+        except UnicodeDecodeError:
+            pass
+    return data.decode('latin-1')
+
+
+# ---------------------------------------------------------------- Vorbis 注释（FLAC / OGG / Opus）
+
+_VORBIS_KEYS = {
+    'ARTIST': 'artist', 'TITLE': 'title', 'LANGUAGE': 'language',
+    'ALBUMARTIST': 'album_artist', 'ALBUM ARTIST': 'album_artist',
+}
+
+
+def _parse_vorbis_comment(data: bytes) -> Dict[str, List[str]]:
+    """解析 Vorbis 注释，数据被截断时返回截断前已解析的字段"""
+    fields = {}
+    if len(data) < 8:
+        return fields
+
+    vendor_length = struct.unpack_from('<I', data, 0)[0]
+    offset = 4 + vendor_length
+    if offset + 4 > len(data):
+        return fields
+
+    count = struct.unpack_from('<I', data, offset)[0]
+    offset += 4
+    for _ in range(count):
+        if offset + 4 > len(data):
+            break
+        length = struct.unpack_from('<I', data, offset)[0]
+        offset += 4
+        if offset + length > len(data):
+            break
+
+        comment = data[offset:offset + length].decode('utf-8', errors='replace')
+        offset += length
+        name, separator, value = comment.partition('=')
+        key = _VORBIS_KEYS.get(name.upper())
+        if separator and key:
+            _add(fields, key, value)
+
+    return fields
+
+
+def _read_flac(f: BinaryIO) -> Dict[str, List[str]]:
+    """读取 FLAC 元数据块中的 Vorbis 注释（f 位于 fLaC 标记之后）"""
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            return {}
+
+        is_last = header[0] & 0x80
+        block_type = header[0] & 0x7f
+        length = int.from_bytes(header[1:4], 'big')
+        if block_type == 4:
+            return _parse_vorbis_comment(f.read(min(length, MAX_FIELD_BYTES)))
+        if is_last:
+            return {}
+        f.seek(length, os.SEEK_CUR)
+
+
+def _read_ogg(f: BinaryIO) -> Dict[str, List[str]]:
+    """读取 OGG 第一个逻辑流的第二个数据包（Vorbis 或 Opus 的注释头）"""
+    packets = []
+    current = b''
+    serial = None
+
+    for _ in range(MAX_OGG_PAGES):
+        header = f.read(27)
+        if len(header) < 27 or header[:4] != b'OggS':
+            break
+
+        page_serial = header[14:18]
+        lacing = f.read(header[26])
+        body = f.read(sum(lacing))
+        if serial is None:
+            serial = page_serial
+        elif page_serial != serial:
+            # 其它逻辑流的页
+            continue
+
+        offset = 0
+        for segment in lacing:
+            current += body[offset:offset + segment]
+            offset += segment
+            if segment < 255:
+                packets.append(current)
+                current = b''
+        if len(packets) >= 2 or len(current) >= MAX_FIELD_BYTES:
+            break
+
+    # 注释包可能因内嵌图片超出读取范围，此时解析已读取的部分
+    comment = packets[1] if len(packets) >= 2 else (current if len(packets) == 1 else b'')
+    if comment.startswith(b'\x03vorbis'):
+        return _parse_vorbis_comment(comment[7:])
+    if comment.startswith(b'OpusTags'):
+        return _parse_vorbis_comment(comment[8:])
+    return {}
+
+
+# ---------------------------------------------------------------- MP4 (M4A)
+
+_MP4_KEYS = {b'\xa9ART': 'artist', b'\xa9nam': 'title', b'aART': 'album_artist'}
+
+
+def _iter_atoms(f: BinaryIO, start: int, end: int):
+    """遍历 [start, end) 范围内的子 atom，产出 (类型, 数据起点, 数据终点)"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, atom_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            extended = f.read(8)
+            if len(extended) < 8:
+                return
+            size = struct.unpack('>Q', extended)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size:
+            return
+
+        yield atom_type, position + header_size, min(position + size, end)
+        position += size
+
+
+def _find_atom(f: BinaryIO, start: int, end: int, atom_type: bytes):
+    for child_type, child_start, child_end in _iter_atoms(f, start, end):
+        if child_type == atom_type:
+            return child_start, child_end
+    return None
+
+
+def _read_mp4(f: BinaryIO) -> Dict[str, List[str]]:
+    """读取 moov/udta/meta/ilst 中的歌手和标题，只读取 atom 头部和需要的数据"""
+    file_end = f.seek(0, os.SEEK_END)
+
+    moov = _find_atom(f, 0, file_end, b'moov')
+    udta = moov and _find_atom(f, moov[0], moov[1], b'udta')
+    meta = udta and _find_atom(f, udta[0], udta[1], b'meta')
+    if not meta:
+        return {}
+
+    # meta 通常是带版本号的 full box；部分 QuickTime 文件没有版本号字段
+    f.seek(meta[0])
+    probe = f.read(8)
+    meta_start = meta[0] if probe[4:8] == b'hdlr' else meta[0] + 4
+
+    ilst = _find_atom(f, meta_start, meta[1], b'ilst')
+    if not ilst:
+        return {}
+
+    fields = {}
+    for item_type, item_start, item_end in _iter_atoms(f, ilst[0], ilst[1]):
+        key = _MP4_KEYS.get(item_type)
+        if key is None:
+            continue
+        data = _find_atom(f, item_start, item_end, b'data')
+        if not data or data[1] - data[0] > MAX_FIELD_BYTES:
+            continue
+
+        f.seek(data[0])
+        payload = f.read(data[1] - data[0])
+        # 前 8 字节为类型和区域，类型 1 为 UTF-8 文本
+        if len(payload) > 8 and payload[:4] == b'\x00\x00\x00\x01':
+            _add(fields, key, payload[8:].decode('utf-8', errors='replace'))
+
+    return fields
@@ -7,10 +7,21 @@ from .base import LLMProvider
 from .deepseek_provider import DeepseekProvider
 from .ollama_provider import OllamaProvider
 from .filename_analyzer import FilenameAnalyzer
+from .cache import ResultCache
+from .local_parsers import LocalParser, LocalParserChain
+from .language_classifier import classify_language
+from .artist_lexicon import ArtistLexicon
+from .canonical import canonicalize
 
 __all__ = [
     'LLMProvider',
     'DeepseekProvider', 
     'OllamaProvider',
-    'FilenameAnalyzer'
+    'FilenameAnalyzer',
+    'ResultCache',
+    'LocalParser',
+    'LocalParserChain',
+    'classify_language',
+    'ArtistLexicon',
+    'canonicalize'
 ] 
\ No newline at end of file
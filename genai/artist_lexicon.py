@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+歌手词典
+收集LLM分析结果中的歌手名和用户提供的歌手列表，编译为 Aho-Corasick 自动机，
+一次线性扫描即可找出文件名中出现的所有已知歌手，
+使分析器可以在本地确定歌手，直接得出结果或只让LLM识别歌曲名
+
+用户歌手列表（artists.txt）每行一个歌手名，# 开头的行为注释
+"""
+
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .local_parsers import LocalParserChain
+
+UNKNOWN_ARTIST = "未知"
+
+# 太短的歌手名容易误匹配歌曲名中的字词
+MIN_HAN_LENGTH = 2
+MIN_LATIN_LENGTH = 3
+
+_HAN_PATTERN = re.compile(r'[㐀-鿿豈-﫿]')
+# 多个歌手之间、歌手和歌名之间可能出现的分隔符
+_SEPARATORS = ' _-–—.&、,，/+'
+_AMBIGUOUS_PATTERN = re.compile(r'[-–—()（）]')
+# 歌手和歌名之间的分隔符
+_DASH_PATTERN = re.compile(r'\s*[-–—]+\s*')
+_BOOK_TITLE_PATTERN = re.compile(r'《[^》]*》')
+
+
+def split_processed_artist(artist: str) -> List[str]:
+    """
+    拆分 _process_artist_name 的输出（"张三 李四 王五等"）为单个歌手名
+
+    含汉字的结果按空格拆分；英文歌手名本身含空格，无法区分时整体作为一个歌手名。
+    """
+    artist = artist.strip()
+    if not artist or artist == UNKNOWN_ARTIST:
+        return []
+    if not _HAN_PATTERN.search(artist):
+        return [artist]
+    if artist.endswith("等"):
+        artist = artist[:-1]
+    return [name for name in artist.split() if name]
+
+
+def load_artist_list(path: Path) -> List[str]:
+    """读取用户歌手列表，文件不存在或无法读取时返回空列表"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    except OSError:
+        return []
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class ArtistLexicon:
+    """已知歌手名的 Aho-Corasick 自动机（不区分大小写）"""
+
+    def __init__(self, artists: Iterable[str] = ()):
+        self._artists: Dict[str, str] = {}  # 小写歌手名 -> 歌手名
+        self._lock = threading.Lock()
+        self._dirty = True
+        # 自动机：每个状态的转移表、失败指针、以该状态结尾的歌手名（小写）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self.add_many(artists)
+
+    @classmethod
+    def from_sources(cls, result_cache=None, artist_list: Optional[Path] = None) -> 'ArtistLexicon':
+        """
+        从LLM结果缓存和用户歌手列表创建词典
+
+        Args:
+            result_cache: ResultCache 实例（可选）
+            artist_list: 用户歌手列表文件（可选）
+        """
+        lexicon = cls()
+        if result_cache is not None:
+            for artist in result_cache.get_artists():
+                lexicon.add_many(split_processed_artist(artist))
+        if artist_list is not None:
+            lexicon.add_many(load_artist_list(artist_list))
+        return lexicon
+
+    def __len__(self) -> int:
+        return len(self._artists)
+
+    def __contains__(self, artist: object) -> bool:
+        return isinstance(artist, str) and artist.strip().lower() in self._artists
+
+    def add(self, artist: str) -> bool:
+        """
+        添加歌手名，过短的名称会被忽略
+
+        Returns:
+            bool: 是否新增了歌手名
+        """
+        artist = artist.strip()
+        key = artist.lower()
+        if key in self._artists or len(key) != len(artist):
+            return False
+        if len(artist) < (MIN_HAN_LENGTH if _HAN_PATTERN.search(artist) else MIN_LATIN_LENGTH):
+            return False
+
+        with self._lock:
+            self._artists[key] = artist
+            self._dirty = True
+        return True
+
+    def add_many(self, artists: Iterable[str]) -> int:
+        """添加多个歌手名，返回新增数量"""
+        return sum(1 for artist in artists if self.add(artist))
+
+    def learn(self, llm_result: Dict) -> int:
+        """从一条LLM分析结果中学习歌手名，返回新增数量"""
+        if "error" in llm_result:
+            return 0
+        return self.add_many(split_processed_artist(llm_result.get("artist", "")))
+
+    def _build(self):
+        """重新编译自动机（调用方需持有锁）"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[str]] = [[]]
+        for key in self._artists:
+            state = 0
+            for char in key:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(key)
+
+        # 按广度优先顺序计算失败指针，并合并失败链上的输出
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state].extend(output[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(names) for names in output]
+        self._dirty = False
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        找出文本中出现的所有已知歌手名
+
+        英文歌手名要求两侧不是字母或数字，避免匹配单词的一部分。
+
+        Returns:
+            List[Tuple[int, int, str]]: (起始位置, 结束位置, 歌手名)，按结束位置排列
+        """
+        with self._lock:
+            if self._dirty:
+                self._build()
+            goto, fail, output = self._goto, self._fail, self._output
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = text
+
+        matches = []
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for key in output[state]:
+                start = end - len(key)
+                if _is_word_char(key[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(key[-1]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+                matches.append((start, end, self._artists[key]))
+        return matches
+
+    def find_artists(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        找出文本中互不重叠的已知歌手名（从左到右，同一位置优先取最长的名称）
+
+        Returns:
+            List[Tuple[int, int, str]]: (起始位置, 结束位置, 歌手名)，按位置排列
+        """
+        selected = []
+        last_end = 0
+        for start, end, artist in sorted(self.find_all(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start >= last_end:
+                selected.append((start, end, artist))
+                last_end = end
+        return selected
+
+    def resolve(self, stem: str) -> Tuple[str, str]:
+        """
+        在文件名（不含扩展名）中查找已知歌手，并推断歌曲名
+
+        歌手名也可能是普通单词（"Love"、"Yes"），只有已知歌手恰好占据分隔符的一侧、
+        另一侧没有已知歌手时才采用："歌手 - 歌名"、"歌名 - 歌手"，或没有分隔符时的 "歌手《歌名》"。
+        歌手名中的连字符（"Jay-Z"）不算分隔符。
+
+        Returns:
+            Tuple[str, str]: (歌手名, 歌曲名)。没有已知歌手或无法确定歌手所在一侧时都为空；
+            找到歌手但另一侧的内容无法确定为歌曲名时，歌曲名为空
+        """
+        text, _ = LocalParserChain.preprocess(stem)
+        matches = self.find_artists(text)
+        if not matches:
+            return "", ""
+
+        separators = [
+            separator for separator in _DASH_PATTERN.finditer(text)
+            if not any(start < separator.end() and separator.start() < end for start, end, _ in matches)
+        ]
+        if len(separators) > 1:
+            return "", ""
+
+        if separators:
+            separator = separators[0]
+            sides = [(0, separator.start()), (separator.end(), len(text))]
+        else:
+            # 没有分隔符时只接受书名号中的歌名
+            song = _BOOK_TITLE_PATTERN.search(text)
+            if song is None:
+                return "", ""
+            sides = [(0, song.start()), (song.start(), song.end()), (song.end(), len(text))]
+
+        # 歌曲名所在的一侧不能有已知歌手，歌手所在的一侧除歌手名外只能有分隔符
+        song_sides = []
+        for side_start, side_end in sides:
+            side_matches = [m for m in matches if side_start <= m[0] and m[1] <= side_end]
+            if not side_matches:
+                if text[side_start:side_end].strip(_SEPARATORS):
+                    song_sides.append((side_start, side_end))
+                continue
+            position = side_start
+            for start, end, _ in side_matches:
+                if text[position:start].strip(_SEPARATORS):
+                    return "", ""
+                position = end
+            if text[position:side_end].strip(_SEPARATORS):
+                return "", ""
+        if len(song_sides) != 1:
+            return "", ""
+        if any(not any(s <= m[0] and m[1] <= e for s, e in sides) for m in matches):
+            return "", ""
+
+        artists = []
+        for _, _, artist in matches:
+            if artist not in artists:
+                artists.append(artist)
+
+        song_name = ""
+        candidate = text[song_sides[0][0]:song_sides[0][1]].strip(_SEPARATORS)
+        if candidate.startswith('《') and candidate.endswith('》'):
+            candidate = candidate[1:-1].strip()
+        if candidate and not candidate.isdigit() and not _AMBIGUOUS_PATTERN.search(candidate):
+            song_name = ' '.join(candidate.split())
+
+        return " & ".join(artists), song_name
@@ -6,14 +6,28 @@ LLM提供者基类
 
 import json
 import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 
 class LLMProvider(ABC):
     """LLM提供者基类"""
     
+    # 提示词版本，修改分析提示词或解析规则后需要递增，使旧的缓存结果失效
+    # 2: 批量分析的JSON数组格式
+    # 3: 语言已知时省略语言识别要求
+    # 4: 歌手已知时只识别歌曲名
+    PROMPT_VERSION = 4
+    
+    # 批量分析时为每个文件名预留的生成token数
+    BATCH_TOKENS_PER_FILE = 80
+    
+    # 服务可用性检查结果的缓存时间（秒）
+    AVAILABILITY_TTL = 60
+    
     def __init__(self, config_manager=None, **kwargs):
         """
         初始化LLM提供者
@@ -24,19 +38,54 @@ class LLMProvider(ABC):
         """
         self.config = kwargs
         self.config_manager = config_manager
+        self._availability = None
+        self._availability_checked_at = 0.0
+        self._availability_lock = threading.Lock()
+        
+    def is_available(self, use_cache: bool = True) -> bool:
+        """
+        检查LLM服务是否可用
+        
+        检查结果会缓存 AVAILABILITY_TTL 秒。
+        
+        Args:
+            use_cache: 是否使用缓存的检查结果
+            
+        Returns:
+            bool: 服务是否可用
+        """
+        with self._availability_lock:
+            now = time.monotonic()
+            if (use_cache and self._availability is not None and
+                    now - self._availability_checked_at < self.AVAILABILITY_TTL):
+                return self._availability
+                
+            try:
+                available = self._check_availability()
+            except Exception:
+                available = False
+                
+            self._availability = available
+            self._availability_checked_at = time.monotonic()
+            return available
         
     @abstractmethod
-    def is_available(self) -> bool:
-        """检查LLM服务是否可用"""
+    def _check_availability(self) -> bool:
+        """
+        探测LLM服务是否可用
+        
+        只应访问模型列表等元数据接口，不能触发模型推理或计费请求。
+        """
         pass
         
     @abstractmethod
-    def _make_llm_request(self, prompt: str) -> str:
+    def _make_llm_request(self, prompt: str, max_tokens: int = 200) -> str:
         """
         向LLM发送请求并获取响应
         
         Args:
             prompt: 分析提示词
+            max_tokens: 最大生成token数
             
         Returns:
             LLM的原始响应内容
@@ -51,12 +100,14 @@ class LLMProvider(ABC):
         """获取提供者名称"""
         pass
         
-    def analyze_filename(self, filename: str) -> Dict[str, str]:
+    def analyze_filename(self, filename: str, language: str = "", artist: str = "") -> Dict[str, str]:
         """
         分析文件名并提供重命名建议
         
         Args:
             filename: 原始文件名
+            language: 已经在本地确定的语言（国语/粤语/英语），提供时提示词中不再要求识别语言
+            artist: 已经在本地确定的歌手名，提供时提示词中不再要求识别歌手
             
         Returns:
             Dict包含:
@@ -67,17 +118,56 @@ class LLMProvider(ABC):
             - confidence: 置信度 (0-1)
         """
         try:
-            prompt = self._create_analysis_prompt(filename)
+            prompt = self._create_analysis_prompt(filename, language, artist)
             content = self._make_llm_request(prompt)
-            return self._parse_llm_response(filename, content)
+            return self._parse_llm_response(filename, content, language, artist)
         except Exception as e:
             return self._create_error_result(filename, f"请求失败: {str(e)}")
     
+    def analyze_filenames(self, filenames: List[str], language: str = "",
+                          artists: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """
+        在一次请求中分析多个文件名
+        
+        多个文件名共用一份分析要求，LLM返回JSON数组。解析失败或缺失的条目
+        会退回到单个文件名的请求。
+        
+        Args:
+            filenames: 原始文件名列表
+            language: 这组文件名共同的已知语言，为空时由LLM识别
+            artists: 与 filenames 一一对应的已知歌手名（可选），提供时由LLM只识别歌曲名
+            
+        Returns:
+            List[Dict]: 分析结果列表，顺序与输入一致，格式同 analyze_filename
+        """
+        artists = artists or [""] * len(filenames)
+        if len(filenames) <= 1:
+            return [self.analyze_filename(filename, language, artist) for filename, artist in zip(filenames, artists)]
+            
+        try:
+            prompt = self._create_batch_analysis_prompt(filenames, language, artists)
+            content = self._make_llm_request(prompt, max_tokens=self.BATCH_TOKENS_PER_FILE * len(filenames))
+            results = self._parse_batch_llm_response(filenames, content, language, artists)
+        except Exception:
+            results = [None] * len(filenames)
+            
+        # 缺失或无法解析的条目单独请求
+        return [
+            result if result is not None else self.analyze_filename(filename, language, artist)
+            for filename, artist, result in zip(filenames, artists, results)
+        ]
+    
     def _get_max_song_name_length(self) -> int:
         """获取歌曲名最大长度配置"""
         if self.config_manager and hasattr(self.config_manager, 'config'):
             return self.config_manager.config.analysis.max_song_name_length
         return 20  # 默认值
+    
+    def _get_max_concurrency(self) -> int:
+        """获取LLM请求并发数配置"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return max(1, self.config_manager.config.analysis.max_concurrency)
+        return 1  # 默认值
         
     def _process_artist_name(self, artist_name: str) -> str:
         """
@@ -155,32 +245,72 @@ class LLMProvider(ABC):
         # 如果原文件名也超过最大长度，截取指定长度
         return song_name[:max_length]
     
-    def _create_analysis_prompt(self, filename: str) -> str:
-        """创建分析提示词"""
-        max_length = self._get_max_song_name_length()
+    def _create_analysis_prompt(self, filename: str, language: str = "", artist: str = "") -> str:
+        """创建分析提示词，语言或歌手已知时省略相应的识别要求和字段"""
+        known_artist = f'\n歌手已确定为"{artist}"' if artist else ""
         return f"""
-请分析这个音乐文件名："{filename}"
-
-要求：
-1. 识别歌手名称：
-   - 如果是单个歌手，直接使用歌手名
-   - 如果是多个歌手，最多列出3个歌手名，用空格连接，如"张三 李四 王五"
-   - 如果超过3个歌手，列出前3个歌手名加"等"，如"张三 李四 王五等"
-   - 如果无法确定则使用"未知"
-2. 识别语言类型：国语、粤语、英语三种之一，默认国语
-3. 识别歌曲名称，限制在{max_length}个汉字长度内，先从原文件名中截取，如果超长则给出合适的总结
-4. 按照"歌手-语言-歌曲名"格式给出建议
+请分析这个音乐文件名："{filename}"{known_artist}
 
+{self._create_analysis_requirements(language, bool(artist))}
 请严格按照以下JSON格式回复，不要包含其他内容：
 {{
-    "artist": "歌手名称",
-    "language": "语言类型",
-    "song_name": "歌曲名称",
-    "confidence": 0.8
+{self._create_json_fields(language, bool(artist), "    ")}
 }}
 """
     
-    def _parse_llm_response(self, filename: str, content: str) -> Dict[str, str]:
+    def _create_batch_analysis_prompt(self, filenames: List[str], language: str = "",
+                                      artists: Optional[List[str]] = None) -> str:
+        """创建批量分析提示词，语言或歌手已知时省略相应的识别要求和字段"""
+        artists = artists or [""] * len(filenames)
+        artist_known = all(artists)
+        numbered = "\n".join(
+            f'{i}. "{filename}"' + (f'（歌手：{artist}）' if artist_known else "")
+            for i, (filename, artist) in enumerate(zip(filenames, artists), 1)
+        )
+        return f"""
+请分别分析以下{len(filenames)}个音乐文件名：
+{numbered}
+
+对每个文件名的{self._create_analysis_requirements(language, artist_known)}
+请严格按照以下JSON数组格式回复，每个文件名对应一个元素，index为文件名的编号，不要包含其他内容：
+[
+    {{
+        "index": 1,
+{self._create_json_fields(language, artist_known, "        ")}
+    }}
+]
+"""
+    
+    @staticmethod
+    def _create_json_fields(language: str, artist_known: bool, indent: str) -> str:
+        """创建回复格式中需要LLM填写的字段"""
+        fields = []
+        if not artist_known:
+            fields.append('"artist": "歌手名称",')
+        if not language:
+            fields.append('"language": "语言类型",')
+        fields.append('"song_name": "歌曲名称",')
+        fields.append('"confidence": 0.8')
+        return "\n".join(indent + field for field in fields)
+    
+    def _create_analysis_requirements(self, language: str = "", artist_known: bool = False) -> str:
+        """创建单个和批量提示词共用的分析要求，语言或歌手已在本地确定时不要求LLM识别"""
+        max_length = self._get_max_song_name_length()
+        rules = []
+        if not artist_known:
+            rules.append('''识别歌手名称：
+   - 如果是单个歌手，直接使用歌手名
+   - 如果是多个歌手，最多列出3个歌手名，用空格连接，如"张三 李四 王五"
+   - 如果超过3个歌手，列出前3个歌手名加"等"，如"张三 李四 王五等"
+   - 如果无法确定则使用"未知"''')
+        if not language:
+            rules.append("识别语言类型：国语、粤语、英语三种之一，默认国语")
+        rules.append(f"识别歌曲名称，限制在{max_length}个汉字长度内，先从原文件名中截取，如果超长则给出合适的总结")
+        if not language and not artist_known:
+            rules.append('按照"歌手-语言-歌曲名"格式给出建议')
+        return "要求：\n" + "".join(f"{i}. {rule}\n" for i, rule in enumerate(rules, 1))
+    
+    def _parse_llm_response(self, filename: str, content: str, language: str = "", artist: str = "") -> Dict[str, str]:
         """解析LLM响应"""
         try:
             # 尝试提取JSON内容
@@ -188,37 +318,81 @@ class LLMProvider(ABC):
             if json_match:
                 json_str = json_match.group()
                 data = json.loads(json_str)
-                
-                artist = data.get("artist", "未知").strip()
-                language = data.get("language", "国语").strip()
-                song_name = data.get("song_name", "未知歌曲").strip()
-                confidence = float(data.get("confidence", 0.5))
-                
-                # 验证语言类型
-                if language not in ["国语", "粤语", "英语"]:
-                    language = "国语"
-                
-                # 处理歌手名称
-                artist = self._process_artist_name(artist)
-                
-                # 处理歌曲名长度限制
-                song_name = self._process_song_name(song_name, filename)
-                
-                suggested_name = f"{artist}-{language}-{song_name}"
-                
-                return {
-                    "artist": artist,
-                    "language": language,
-                    "song_name": song_name,
-                    "suggested_name": suggested_name,
-                    "confidence": confidence
-                }
+                return self._create_result_from_data(filename, data, language, artist)
                 
         except Exception as e:
             pass
             
         return self._create_error_result(filename, "响应解析失败")
     
+    def _parse_batch_llm_response(self, filenames: List[str], content: str, language: str = "",
+                                  artists: Optional[List[str]] = None) -> List[Optional[Dict[str, str]]]:
+        """
+        解析批量分析的LLM响应
+        
+        Returns:
+            List: 与输入顺序一致的结果列表，无法解析或缺失的条目为None
+        """
+        results = [None] * len(filenames)
+        artists = artists or [""] * len(filenames)
+        
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not json_match:
+            return results
+            
+        try:
+            items = json.loads(json_match.group())
+        except ValueError:
+            return results
+            
+        if not isinstance(items, list):
+            return results
+            
+        for position, data in enumerate(items):
+            if not isinstance(data, dict):
+                continue
+                
+            # 优先使用index定位，缺少index时按数组位置对应
+            try:
+                i = int(data.get("index", position + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+                
+            if 0 <= i < len(filenames) and results[i] is None:
+                try:
+                    results[i] = self._create_result_from_data(filenames[i], data, language, artists[i])
+                except Exception:
+                    results[i] = None
+                    
+        return results
+    
+    def _create_result_from_data(self, filename: str, data: Dict, language: str = "", artist: str = "") -> Dict[str, str]:
+        """根据LLM返回的JSON数据生成分析结果，提供已知的语言或歌手时忽略数据中的对应字段"""
+        artist = artist or data.get("artist", "未知").strip()
+        language = language or data.get("language", "国语").strip()
+        song_name = data.get("song_name", "未知歌曲").strip()
+        confidence = float(data.get("confidence", 0.5))
+        
+        # 验证语言类型
+        if language not in ["国语", "粤语", "英语"]:
+            language = "国语"
+        
+        # 处理歌手名称
+        artist = self._process_artist_name(artist)
+        
+        # 处理歌曲名长度限制
+        song_name = self._process_song_name(song_name, filename)
+        
+        suggested_name = f"{artist}-{language}-{song_name}"
+        
+        return {
+            "artist": artist,
+            "language": language,
+            "song_name": song_name,
+            "suggested_name": suggested_name,
+            "confidence": confidence
+        }
+    
     def _create_error_result(self, filename: str, error: str) -> Dict[str, str]:
         """创建错误结果"""
         return {
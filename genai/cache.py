@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+LLM分析结果缓存
+使用SQLite持久化文件名分析结果，按最近使用时间淘汰旧条目
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .canonical import canonicalize
+
+
+class ResultCache:
+    """LLM分析结果的磁盘缓存（LRU淘汰）"""
+
+    CACHE_FILE = "genai_cache.db"
+    DEFAULT_MAX_ENTRIES = 20000
+    COMMIT_INTERVAL = 100  # 累计多少次写入后提交一次
+
+    def __init__(self, cache_path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        初始化结果缓存
+
+        Args:
+            cache_path: 缓存数据库路径（默认: 当前目录下的 genai_cache.db）
+            max_entries: 最大缓存条目数，超出后淘汰最久未使用的条目
+        """
+        self.cache_path = Path(cache_path) if cache_path else Path.cwd() / self.CACHE_FILE
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+
+        # 分析在线程池中并发进行，共享一个连接并用锁保护
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._closed = False
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)")
+        self._conn.commit()
+        self._entry_count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def make_key(stem: str, provider: str, model: str, prompt_version: int, max_song_name_length: int,
+                 language_hint: str = "", artist_hint: str = "") -> str:
+        """
+        生成缓存键
+
+        Args:
+            stem: 文件名（不含扩展名），规范化后作为键的一部分
+            provider: LLM提供者名称
+            model: 模型名称
+            prompt_version: 提示词版本
+            max_song_name_length: 歌曲名最大长度配置
+            language_hint: 请求时提供给LLM的已知语言（未提供时为空），提供与否的结果分别缓存
+            artist_hint: 请求时提供给LLM的已知歌手名（未提供时为空）
+
+        Returns:
+            str: 缓存键
+        """
+        return "\x1f".join([
+            canonicalize(stem), provider, model, str(prompt_version), str(max_song_name_length),
+            language_hint, artist_hint
+        ])
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """
+        查询缓存
+
+        Returns:
+            Optional[Dict]: 缓存的LLM分析结果，未命中时返回None
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE cache_key = ?", (time.time(), cache_key)
+            )
+            self._record_write()
+
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, cache_key: str, result: Dict):
+        """写入缓存"""
+        data = json.dumps(result, ensure_ascii=False)
+
+        with self._lock:
+            # 关闭后仍在运行的分析线程的写入直接丢弃
+            if self._closed:
+                return
+            cursor = self._conn.execute(
+                "UPDATE results SET result = ?, last_used = ? WHERE cache_key = ?",
+                (data, time.time(), cache_key)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO results (cache_key, result, last_used) VALUES (?, ?, ?)",
+                    (cache_key, data, time.time())
+                )
+                self._entry_count += 1
+
+            if self._entry_count > self.max_entries:
+                self._evict()
+            self._record_write()
+
+    def _evict(self):
+        """淘汰最久未使用的条目，一次多淘汰10%以减少淘汰次数"""
+        target = int(self.max_entries * 0.9)
+        remove_count = self._entry_count - target
+        self._conn.execute(
+            "DELETE FROM results WHERE cache_key IN "
+            "(SELECT cache_key FROM results ORDER BY last_used LIMIT ?)",
+            (remove_count,)
+        )
+        self._entry_count = target
+
+    def _record_write(self):
+        """记录一次写入，达到间隔后提交（调用方需持有锁）"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.COMMIT_INTERVAL:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def flush(self):
+        """提交尚未写入磁盘的修改"""
+        with self._lock:
+            if self._pending_writes and not self._closed:
+                self._conn.commit()
+                self._pending_writes = 0
+
+    def get_artists(self) -> List[str]:
+        """获取缓存结果中出现过的歌手名（去重），用于构建歌手词典"""
+        with self._lock:
+            rows = self._conn.execute("SELECT result FROM results").fetchall()
+
+        artists = {}
+        for (data,) in rows:
+            try:
+                artist = json.loads(data).get("artist", "")
+            except (ValueError, AttributeError):
+                continue
+            if artist:
+                artists[artist] = None
+        return list(artists)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self._pending_writes = 0
+            self._entry_count = 0
+
+    def close(self):
+        """提交修改并关闭数据库连接，可以重复调用"""
+        self.flush()
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: 包含 hits、misses、hit_rate、entries
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._entry_count
+        }
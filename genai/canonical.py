@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+文件名规范化
+同一首歌常以不同的文件名出现（"周杰伦-晴天"、"03-周杰伦 - 晴天 [320k]"），
+规范化后得到相同的键，用于LLM结果缓存和批量分析时合并相同的请求
+
+处理步骤：NFKC（全角转半角）→ casefold → 一个预编译的正则表达式一次扫描完成
+去除序号前缀、括号中或末尾的码率和格式标记、方括号中的来源等信息，并统一分隔符和空白。
+(Live)、[伴奏] 等版本标记和圆括号中的其它内容（可能是歌手名）会保留并统一为圆括号，
+不同版本不会共用一个结果
+"""
+
+import re
+import unicodedata
+
+from .local_parsers import NOISE_KEYWORDS
+
+# 方括号中的语言标记影响分析结果，需要保留
+_LANGUAGE_MARKS = ('国语', '粤语', '英语', '英文', '普通话', '广东话')
+
+# 码率、音质和格式标记，只在括号中或文件名末尾出现时去除（"Sia - Flac" 中的 Flac 是歌名）
+_QUALITY_TAGS = (
+    r'\d{2,4}\s?kbps', r'\d{2,4}k', r'\d{2}bit', r'\d{2,3}(?:\.\d)?khz',
+    'flac', 'ape', 'wav', 'mp3', 'm4a', 'aac', 'ogg', 'dsd', 'hi-?res', 'hq', 'sq', 'mv', '无损', '高品质', '试听'
+)
+_QUALITY_WORDS = {'mv', 'hq', 'sq', 'hi-res', 'flac', 'mp3', 'ape', 'wav', 'kbps', '320k', '128k', '无损', '高品质', '试听'}
+
+
+def _keyword_pattern(keyword: str) -> str:
+    # 英文关键词按完整单词匹配
+    if keyword.isascii():
+        return rf'(?<![a-z]){re.escape(keyword)}(?![a-z])'
+    return re.escape(keyword)
+
+
+_MARKS = '|'.join(_LANGUAGE_MARKS)
+_VERSIONS = '|'.join(_keyword_pattern(keyword) for keyword in NOISE_KEYWORDS if keyword not in _QUALITY_WORDS)
+_QUALITY = '(?:{})(?![a-z0-9])'.format('|'.join(_QUALITY_TAGS))
+
+_CANONICAL_PATTERN = re.compile(
+    # 序号前缀：03.、3、、3 - 、3-周杰伦、03-、03 （后面没有文字时不是序号，如 "1-2-3"）。
+    # 连字符后直接是英文字母时只去除补零的序号，"7-Eleven" 中的 7 是名称的一部分
+    r'(?P<prefix>(?:^\s*\d{1,3}\s*(?:[.、]|[-_](?=\s|[^\x00-\x7f]))\s*'
+    r'|^\s*0\d{1,2}\s*[-_]\s*|^\s*0\d{1,2}\s+)(?=.*[^\d\W_]))'
+    r'|\s*(?:'
+    # 方括号中的语言标记
+    rf'(?P<mark>[\[【](?P<mark_name>{_MARKS})[\]】])'
+    # 方括号中的版本标记：[Live]、【伴奏版】
+    rf'|(?P<version>[\[【]\s*(?P<version_label>[^\]】]*?(?:{_VERSIONS})[^\]】]*?)\s*[\]】])'
+    # 其它方括号：来源、专辑、音质等
+    r'|(?P<bracket>\[[^\]]*\]|【[^】]*】)'
+    # 只含音质标记的圆括号：(320k)、(flac hq)
+    rf'|(?P<quality_paren>\(\s*{_QUALITY}(?:[\s,/+]+{_QUALITY})*\s*\))'
+    # 其它圆括号：版本标记或歌手名
+    r'|(?P<paren>\(\s*(?P<paren_label>[^()]*?)\s*\))'
+    # 文件名末尾单独出现的音质标记（前面需要是空格而不是分隔符）
+    rf'|(?P<quality>(?<=[^\s\-–—_~]\s){_QUALITY}(?=(?:\s+{_QUALITY})*\s*$))'
+    # 分隔符及两侧的空白
+    r'|(?P<dash>[-–—_~]+\s*)'
+    r')'
+    r'|(?P<space>\s+)'
+)
+
+_REPLACEMENTS = {
+    'prefix': '', 'bracket': '', 'quality_paren': '', 'quality': '', 'dash': '-', 'space': ' '
+}
+
+
+def _replace(match) -> str:
+    kind = match.lastgroup
+    if kind == 'mark':
+        return f"[{match.group('mark_name')}]"
+    if kind == 'version':
+        return f"({' '.join(match.group('version_label').split())})"
+    if kind == 'paren':
+        return f"({' '.join(match.group('paren_label').split())})"
+    return _REPLACEMENTS[kind]
+
+
+def canonicalize(stem: str) -> str:
+    """
+    规范化文件名（不含扩展名）
+
+    Args:
+        stem: 文件名（不含扩展名）
+
+    Returns:
+        str: 规范化后的文件名，去除所有内容后为空时退回到只做大小写和空白规范化的结果
+    """
+    text = unicodedata.normalize('NFKC', stem).casefold()
+    canonical = _CANONICAL_PATTERN.sub(_replace, text).strip(' -')
+    return canonical or ' '.join(text.split())
@@ -32,9 +32,18 @@ class OllamaConfig:
 class AnalysisConfig:
     """分析配置"""
     confidence_threshold: float = 0.4
+    local_confidence_threshold: float = 0.8  # 本地解析结果达到该置信度时不请求LLM
     max_song_name_length: int = 20
     default_language: str = "国语"
     skip_standard_format: bool = True
+    max_concurrency: int = 4  # 同时进行的LLM请求数量
+    batch_size: int = 10  # 每次LLM请求包含的文件名数量，1表示逐个请求
+    cache_enabled: bool = True  # 是否缓存LLM分析结果
+    cache_max_entries: int = 20000  # 缓存最大条目数
+    use_file_tags: bool = True  # 文件标签中已有歌手和歌曲名时直接使用，不请求LLM
+    language_confidence_threshold: float = 0.8  # 本地语言分类结果达到该置信度时不再让LLM识别语言
+    use_artist_lexicon: bool = True  # 用已知歌手词典在本地识别歌手
+    artist_list_file: str = "artists.txt"  # 用户歌手列表，每行一个歌手名
 
 
 @dataclass
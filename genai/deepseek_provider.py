@@ -5,6 +5,7 @@ Deepseek LLM提供者
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict
 from .base import LLMProvider
 
@@ -35,33 +36,36 @@ class DeepseekProvider(LLMProvider):
             "Content-Type": "application/json"
         })
         
-    def is_available(self) -> bool:
-        """检查Deepseek服务是否可用"""
+        # 连接池大小与并发数一致，避免并发请求时反复建立连接
+        pool_size = self._get_max_concurrency()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+    def _check_availability(self) -> bool:
+        """检查Deepseek服务是否可用（只读取模型列表，不产生计费请求）"""
         if not self.api_key:
             return False
             
         try:
-            response = self.session.post(
-                f"{self.api_base}/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": "Hello"}],
-                    "max_tokens": 5
-                },
-                timeout=10
-            )
-            return response.status_code == 200
+            response = self.session.get(f"{self.api_base}/models", timeout=10)
+            if response.status_code != 200:
+                return False
+                
+            models = {model.get("id", "") for model in response.json().get("data", [])}
+            # 模型列表为空时只以接口可访问为准
+            return not models or self.model in models
         except Exception:
             return False
             
-    def _make_llm_request(self, prompt: str) -> str:
+    def _make_llm_request(self, prompt: str, max_tokens: int = 200) -> str:
         """向Deepseek发送请求并获取响应"""
         response = self.session.post(
             f"{self.api_base}/chat/completions",
             json={
                 "model": self.model,
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 200,
+                "max_tokens": max_tokens,
                 "temperature": 0.3
             },
             timeout=30
@@ -5,9 +5,16 @@
 """
 
 import re
-from typing import Dict, Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional, List, Tuple
 from pathlib import Path
+from .artist_lexicon import ArtistLexicon
 from .base import LLMProvider
+from .cache import ResultCache
+from .canonical import canonicalize
+from .language_classifier import classify_language
+from .local_parsers import LocalParserChain
 
 
 class FilenameAnalyzer:
@@ -16,22 +23,124 @@ class FilenameAnalyzer:
     # 标准格式正则表达式：歌手-语言-歌曲名
     STANDARD_FORMAT_PATTERN = r'^(.+?)-([国粤英]语|国语|粤语|英语)-(.+)$'
     
-    def __init__(self, llm_provider: LLMProvider, config_manager=None):
+    # 通过歌手词典确定歌手和歌曲名时的置信度
+    LEXICON_CONFIDENCE = 0.85
+    
+    # 歌手词典或文件标签确认了歌手所在一侧时，本地解析结果的置信度
+    CONFIRMED_CONFIDENCE = 0.9
+    
+    def __init__(self, llm_provider: LLMProvider, config_manager=None, result_cache: Optional[ResultCache] = None,
+                 local_parsers: Optional[LocalParserChain] = None, artist_lexicon: Optional[ArtistLexicon] = None):
         """
         初始化分析器
         
         Args:
             llm_provider: LLM提供者实例
             config_manager: 配置管理器实例
+            result_cache: LLM分析结果缓存（可选）
+            local_parsers: 请求LLM之前使用的本地解析器（默认: 内置解析器）
+            artist_lexicon: 已知歌手词典（可选），LLM分析出的新歌手会加入词典
         """
         self.llm_provider = llm_provider
         self.config_manager = config_manager
+        self.result_cache = result_cache
+        self.local_parsers = local_parsers if local_parsers is not None else LocalParserChain()
+        self.artist_lexicon = artist_lexicon
+        # 所有调用共享的LLM请求并发限制：音乐库模式下多个文件夹同时分析，
+        # 各自的线程池加起来也不超过配置的并发数
+        self._llm_slots = threading.BoundedSemaphore(self._get_max_concurrency())
     
     def _get_max_song_name_length(self) -> int:
         """获取歌曲名最大长度配置"""
         if self.config_manager and hasattr(self.config_manager, 'config'):
             return self.config_manager.config.analysis.max_song_name_length
         return 20  # 默认值
+    
+    def _get_max_concurrency(self) -> int:
+        """获取LLM请求并发数配置"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return max(1, self.config_manager.config.analysis.max_concurrency)
+        return 1  # 默认值
+    
+    def _get_local_confidence_threshold(self) -> float:
+        """获取本地解析结果的置信度阈值配置"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return self.config_manager.config.analysis.local_confidence_threshold
+        return 0.8  # 默认值
+    
+    def _get_language_confidence_threshold(self) -> float:
+        """获取本地语言分类结果的置信度阈值配置"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return self.config_manager.config.analysis.language_confidence_threshold
+        return 0.8  # 默认值
+    
+    def _get_batch_size(self) -> int:
+        """获取每次LLM请求包含的文件名数量配置"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return max(1, self.config_manager.config.analysis.batch_size)
+        return 1  # 默认值
+        
+    def _get_cache_key(self, name_without_ext: str, language: str = "", artist: str = "") -> str:
+        """生成LLM结果缓存键，language 和 artist 为请求时提供给LLM的已知语言和歌手"""
+        return ResultCache.make_key(
+            name_without_ext,
+            self.llm_provider.get_provider_name(),
+            getattr(self.llm_provider, 'model', ''),
+            self.llm_provider.PROMPT_VERSION,
+            self._get_max_song_name_length(),
+            language,
+            artist
+        )
+    
+    def detect_language(self, text: str) -> str:
+        """
+        用本地分类器判断语言
+        
+        Returns:
+            str: 置信度达到阈值时返回语言（国语/粤语/英语），否则返回空字符串
+        """
+        language, confidence = classify_language(text)
+        if language and confidence >= self._get_language_confidence_threshold():
+            return language
+        return ""
+    
+    def detect_artist(self, name_without_ext: str) -> Tuple[str, str]:
+        """
+        用歌手词典查找文件名中的已知歌手
+        
+        Returns:
+            Tuple[str, str]: (歌手名, 歌曲名)，未启用词典或没有已知歌手时都为空，歌曲名无法确定时为空
+        """
+        if self.artist_lexicon is None:
+            return "", ""
+        return self.artist_lexicon.resolve(name_without_ext)
+    
+    def _analyze_with_llm(self, name_without_ext: str) -> Dict[str, str]:
+        """
+        调用LLM分析文件名，优先使用缓存结果
+        
+        本地能确定语言或歌手时使用省略相应识别要求的提示词。
+        """
+        language = self.detect_language(name_without_ext)
+        artist, _ = self.detect_artist(name_without_ext)
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self._get_cache_key(name_without_ext, language, artist)
+            llm_result = self.result_cache.get(cache_key)
+            if llm_result is not None:
+                return llm_result
+        
+        with self._llm_slots:
+            llm_result = self.llm_provider.analyze_filename(name_without_ext, language, artist)
+        # 失败的结果不缓存，下次重新请求
+        if "error" not in llm_result:
+            if cache_key is not None:
+                # 单个文件的分析没有批量结束的时机，写入后立即提交
+                self.result_cache.put(cache_key, llm_result)
+                self.result_cache.flush()
+            if self.artist_lexicon is not None:
+                self.artist_lexicon.learn(llm_result)
+        return llm_result
         
     def is_standard_format(self, filename: str) -> bool:
         """
@@ -69,70 +178,341 @@ class FilenameAnalyzer:
                 - song_name: 歌曲名（如果分析了的话）
                 - suggested_name: 建议的文件名
                 - confidence: 置信度（0-1）
-                - provider: LLM提供者名称（如果使用了的话）
+                - provider: 结果来源（LLM提供者名称，标签为 tags，本地解析器为 local:解析器名称）
                 - error: 错误信息（如果有的话）
         """
-        # 去除文件扩展名进行分析
-        name_without_ext = Path(filename).stem
-        max_length = self._get_max_song_name_length()
-        
         # 检查是否已经符合标准格式
         if self.is_standard_format(filename):
-            return {
-                "needs_analysis": False,
-                "is_standard_format": True,
-                "original_name": filename,
-                "suggested_name": f"未知-国语-{name_without_ext[:max_length]}",
-                "confidence": 1.0
-            }
+            return self._create_standard_result(filename)
+        
+        # 本地解析器能够可靠解析的文件名不请求LLM
+        local_result = self.analyze_locally(filename)
+        if local_result is not None:
+            return local_result
             
-        # 使用LLM分析
+        # 使用LLM分析（去除文件扩展名进行分析）
         try:
-            llm_result = self.llm_provider.analyze_filename(name_without_ext)
+            llm_result = self._analyze_with_llm(Path(filename).stem)
+            return self._create_llm_result(filename, llm_result)
+        except Exception as e:
+            return self._create_failed_result(filename, f"分析失败: {str(e)}")
+    
+    def _create_standard_result(self, filename: str) -> Dict[str, str]:
+        """创建已符合标准格式的结果"""
+        name_without_ext = Path(filename).stem
+        max_length = self._get_max_song_name_length()
+        return {
+            "needs_analysis": False,
+            "is_standard_format": True,
+            "original_name": filename,
+            "suggested_name": f"未知-国语-{name_without_ext[:max_length]}",
+            "confidence": 1.0
+        }
+    
+    def _create_llm_result(self, filename: str, llm_result: Dict[str, str]) -> Dict[str, str]:
+        """将LLM提供者的分析结果转换为分析器结果"""
+        name_without_ext = Path(filename).stem
+        max_length = self._get_max_song_name_length()
+        result = {
+            "needs_analysis": True,
+            "is_standard_format": False,
+            "original_name": filename,
+            "artist": llm_result.get("artist", "未知"),
+            "language": llm_result.get("language", "国语"),
+            "song_name": llm_result.get("song_name", "未知歌曲"),
+            "suggested_name": llm_result.get("suggested_name", f"未知-国语-{name_without_ext[:max_length]}"),
+            "confidence": llm_result.get("confidence", 0.5),
+            "provider": self.llm_provider.get_provider_name()
+        }
+        
+        # 如果有错误信息，添加到结果中
+        if "error" in llm_result:
+            result["error"] = llm_result["error"]
             
-            result = {
-                "needs_analysis": True,
-                "is_standard_format": False,
-                "original_name": filename,
-                "artist": llm_result.get("artist", "未知"),
-                "language": llm_result.get("language", "国语"),
-                "song_name": llm_result.get("song_name", "未知歌曲"),
-                "suggested_name": llm_result.get("suggested_name", f"未知-国语-{name_without_ext[:max_length]}"),
-                "confidence": llm_result.get("confidence", 0.5),
-                "provider": self.llm_provider.get_provider_name()
-            }
+        return result
             
-            # 如果有错误信息，添加到结果中
-            if "error" in llm_result:
-                result["error"] = llm_result["error"]
-                
-            return result
+    def uses_file_tags(self) -> bool:
+        """是否优先使用文件标签中的歌手和歌曲名"""
+        if self.config_manager and hasattr(self.config_manager, 'config'):
+            return self.config_manager.config.analysis.use_file_tags
+        return True  # 默认值
+    
+    def create_tag_result(self, filename: str, artist: str, song_name: str, language: str = "") -> Dict[str, str]:
+        """
+        根据文件标签中的信息创建分析结果（不请求LLM）
+        
+        Args:
+            filename: 文件名
+            artist: 标签中的歌手名
+            song_name: 标签中的歌曲名
+            language: 标签中的语言（国语/粤语/英语，未知时为空）
+        """
+        return self._create_local_result(filename, artist, song_name, language, 1.0, "tags")
+    
+    def analyze_locally(self, filename: str, artist_hint: str = "") -> Optional[Dict[str, str]]:
+        """
+        用歌手词典和本地解析器分析文件名
+        
+        先在文件名中查找已知歌手（歌手名本身可能含连字符，需要在按连字符拆分之前查找）；
+        再用本地解析器解析，"歌手 - 歌名" 这类无法判断歌手所在一侧的结果需要歌手词典或
+        文件标签确认。没有歌手信息的结果不会跳过LLM。
+        
+        Args:
+            filename: 文件名
+            artist_hint: 文件标签中的歌手名（可选），用于确认歌手所在的一侧
+        
+        Returns:
+            Optional[Dict]: 置信度达到阈值时返回分析结果，否则返回None（需要请求LLM）
+        """
+        stem = Path(filename).stem
+        threshold = self._get_local_confidence_threshold()
+        parsed = self.local_parsers.parse(stem) if self.local_parsers is not None else None
+        language = parsed.language if parsed is not None else ""
+        
+        # 文件名中有已知歌手，且去掉歌手后只剩歌曲名
+        artist, song_name = self.detect_artist(stem)
+        if artist and song_name and self.LEXICON_CONFIDENCE >= threshold:
+            return self._create_local_result(
+                filename, artist, song_name, language, self.LEXICON_CONFIDENCE, "local:lexicon"
+            )
+        
+        if parsed is None or parsed.artist == "未知":
+            return None
+        
+        artist, song_name, confidence = parsed.artist, parsed.song_name, parsed.confidence
+        # 只有一侧是已知歌手时才能确认（歌手名也可能是歌名，如 "Love - Adele"），文件标签优先
+        side = self._known_artist_side(artist, song_name, artist_hint)
+        if side == 1:
+            # 歌名 - 歌手
+            artist, song_name = song_name, artist
+        if side is not None:
+            confidence = max(confidence, self.CONFIRMED_CONFIDENCE)
+        
+        if confidence < threshold:
+            return None
+        return self._create_local_result(
+            filename, artist, song_name, language, confidence, f"local:{parsed.parser}"
+        )
+    
+    def _known_artist_side(self, left: str, right: str, artist_hint: str = "") -> Optional[int]:
+        """
+        判断分隔符两侧中哪一侧是歌手
+        
+        Returns:
+            Optional[int]: 0 为左侧、1 为右侧；两侧都不是或都是已知歌手时返回None
+        """
+        hint = artist_hint.strip().casefold()
+        for is_artist in (lambda name: bool(hint) and name.casefold() == hint, self._is_known_artist):
+            left_known, right_known = is_artist(left), is_artist(right)
+            if left_known != right_known:
+                return 0 if left_known else 1
+            if left_known:
+                return None
+        return None
+    
+    def _is_known_artist(self, name: str) -> bool:
+        """判断名称是否为歌手词典中的已知歌手"""
+        return self.artist_lexicon is not None and name in self.artist_lexicon
+    
+    def _create_local_result(self, filename: str, artist: str, song_name: str, language: str,
+                             confidence: float, provider: str) -> Dict[str, str]:
+        """
+        创建不经过LLM得到的分析结果
+        
+        歌手名和歌曲名按与LLM结果相同的规则处理；没有语言信息时，
+        使用本地语言分类器的结果，置信度不足时使用默认语言。
+        """
+        if not language:
+            language = self.detect_language(f"{artist} {song_name}")
+        if not language:
+            if self.config_manager and hasattr(self.config_manager, 'config'):
+                language = self.config_manager.config.analysis.default_language
+            else:
+                language = "国语"
+        
+        local_result = self.llm_provider._create_result_from_data(filename, {
+            "artist": artist,
+            "language": language,
+            "song_name": song_name,
+            "confidence": confidence
+        })
+        result = self._create_llm_result(filename, local_result)
+        result["provider"] = provider
+        return result
+    
+    def _create_failed_result(self, filename: str, error: str) -> Dict[str, str]:
+        """创建分析失败的结果"""
+        name_without_ext = Path(filename).stem
+        max_length = self._get_max_song_name_length()
+        return {
+            "needs_analysis": True,
+            "is_standard_format": False,
+            "original_name": filename,
+            "suggested_name": f"未知-国语-{name_without_ext[:max_length]}",
+            "error": error,
+            "confidence": 0.0
+        }
+    
+    def _analyze_chunk_with_llm(self, filenames: List[str], language: str = "",
+                                artists: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """
+        用一次LLM请求分析一组文件名，并写入缓存
+        
+        Args:
+            filenames: 需要LLM分析的文件名列表
+            language: 这组文件名共同的已知语言，为空时由LLM识别
+            artists: 与 filenames 一一对应的已知歌手名（可选）
             
+        Returns:
+            List[Dict]: 分析器结果列表，顺序与输入一致
+        """
+        stems = [Path(filename).stem for filename in filenames]
+        
+        try:
+            with self._llm_slots:
+                llm_results = self.llm_provider.analyze_filenames(stems, language, artists)
         except Exception as e:
-            return {
-                "needs_analysis": True,
-                "is_standard_format": False,
-                "original_name": filename,
-                "suggested_name": f"未知-国语-{name_without_ext[:max_length]}",
-                "error": f"分析失败: {str(e)}",
-                "confidence": 0.0
-            }
+            return [self._create_failed_result(filename, f"分析失败: {str(e)}") for filename in filenames]
+        
+        for stem, artist, llm_result in zip(stems, artists or [""] * len(stems), llm_results):
+            # 失败的结果不缓存，下次重新请求
+            if "error" in llm_result:
+                continue
+            if self.result_cache is not None:
+                self.result_cache.put(self._get_cache_key(stem, language, artist), llm_result)
+            if self.artist_lexicon is not None:
+                self.artist_lexicon.learn(llm_result)
+                    
+        return [
+            self._create_llm_result(filename, llm_result)
+            for filename, llm_result in zip(filenames, llm_results)
+        ]
             
-    def batch_analyze(self, filenames: List[str]) -> List[Dict[str, str]]:
+    def batch_analyze(self, filenames: List[str],
+                      progress_callback: Optional[Callable[[int, int, str], None]] = None) -> List[Dict[str, str]]:
         """
         批量分析文件名
         
         Args:
             filenames: 文件名列表
+            progress_callback: 进度回调，每完成一个文件调用一次，参数为 (已完成数量, 总数, 文件名)
             
         Returns:
-            List[Dict]: 分析结果列表
+            List[Dict]: 分析结果列表，顺序与输入顺序一致
         """
-        results = []
-        for filename in filenames:
-            result = self.analyze_filename(filename)
-            results.append(result)
+        results = [None] * len(filenames)
+        for i, result in self.iter_batch_analyze(filenames, progress_callback):
+            results[i] = result
         return results
+    
+    def iter_batch_analyze(self, filenames: List[str],
+                           progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                           artist_hints: Optional[List[str]] = None
+                           ) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        批量分析文件名，按完成顺序逐个产出结果
+        
+        标准格式、本地解析器能够解析和缓存命中的文件直接得出结果；规范化后相同的文件名只请求一次，
+        其余文件按本地判断出的语言、是否找到已知歌手和 batch_size 分组，每组合并为一次LLM请求，
+        并按配置的并发数同时发送。语言或歌手已知的组使用省略相应识别要求的提示词。
+        
+        Args:
+            filenames: 文件名列表
+            progress_callback: 进度回调，每完成一个文件调用一次，参数为 (已完成数量, 总数, 文件名)
+            artist_hints: 与 filenames 一一对应的文件标签中的歌手名（可选，未知时为空字符串），
+                用于确认本地解析结果中歌手所在的一侧，并作为LLM请求的已知歌手
+            
+        Yields:
+            Tuple[int, Dict]: (文件在输入列表中的位置, 分析结果)
+        """
+        total = len(filenames)
+        completed = 0
+        pending: Dict[Tuple[str, bool], List[int]] = {}  # (已知语言, 是否已知歌手) -> 文件位置
+        known_artists: Dict[int, str] = {}
+        first_by_key: Dict[str, int] = {}  # 规范化文件名 -> 第一个需要请求LLM的文件位置
+        duplicates: Dict[int, List[int]] = {}  # 第一个文件位置 -> 规范化后相同的其它文件位置
+        
+        # 先处理不需要请求LLM的文件
+        for i, filename in enumerate(filenames):
+            stem = Path(filename).stem
+            artist_hint = artist_hints[i] if artist_hints else ""
+            if self.is_standard_format(filename):
+                result = self._create_standard_result(filename)
+            else:
+                result = self.analyze_locally(filename, artist_hint)
+            
+            if result is None:
+                canonical = canonicalize(stem)
+                if canonical in first_by_key:
+                    # 与之前的文件规范化后相同，使用同一个LLM结果
+                    duplicates.setdefault(first_by_key[canonical], []).append(i)
+                    continue
+                    
+                language = self.detect_language(stem)
+                artist = self.detect_artist(stem)[0] or artist_hint
+                if self.result_cache is not None:
+                    llm_result = self.result_cache.get(self._get_cache_key(stem, language, artist))
+                    if llm_result is not None:
+                        result = self._create_llm_result(filename, llm_result)
+                    
+            if result is None:
+                first_by_key[canonical] = i
+                if artist:
+                    known_artists[i] = artist
+                pending.setdefault((language, bool(artist)), []).append(i)
+            else:
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total, filename)
+                yield i, result
+        
+        batch_size = self._get_batch_size()
+        chunks = [
+            (language, indices[start:start + batch_size])
+            for (language, _), indices in pending.items()
+            for start in range(0, len(indices), batch_size)
+        ]
+        max_workers = min(self._get_max_concurrency(), len(chunks))
+        
+        def analyze_chunk(language: str, chunk: List[int]) -> List[Dict[str, str]]:
+            artists = [known_artists.get(i, "") for i in chunk]
+            return self._analyze_chunk_with_llm([filenames[i] for i in chunk], language, artists)
+        
+        def emit(chunk: List[int], chunk_results: List[Dict[str, str]]) -> Iterator[Tuple[int, Dict[str, str]]]:
+            nonlocal completed
+            for first, result in zip(chunk, chunk_results):
+                for i in [first] + duplicates.get(first, []):
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total, filenames[i])
+                    yield i, result if i == first else dict(result, original_name=filenames[i])
+        
+        try:
+            if max_workers <= 1:
+                for language, chunk in chunks:
+                    yield from emit(chunk, analyze_chunk(language, chunk))
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {executor.submit(analyze_chunk, language, chunk): chunk for language, chunk in chunks}
+                    
+                    for future in as_completed(futures):
+                        chunk = futures[future]
+                        try:
+                            chunk_results = future.result()
+                        except Exception as e:
+                            chunk_results = [
+                                self._create_failed_result(filenames[i], f"分析失败: {str(e)}") for i in chunk
+                            ]
+                        yield from emit(chunk, chunk_results)
+        finally:
+            # 批量分析结束后统一提交缓存写入
+            if self.result_cache is not None:
+                self.result_cache.flush()
+        
+    def close(self):
+        """提交并关闭结果缓存"""
+        if self.result_cache is not None:
+            self.result_cache.close()
         
     def get_analysis_stats(self, results: List[Dict[str, str]]) -> Dict[str, int]:
         """
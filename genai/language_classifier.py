@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+本地语言分类器
+根据字符 n-gram 判断文件名的语言（国语/粤语/英语），并给出置信度。
+特征表在导入时构建一次：粤语口语特有的字和词、国语口语特有的字和词；
+不含汉字、只有拉丁字母的文件名判为英语；含有假名、谚文或西里尔字母的文本不判断语言。
+只出现一种区分特征时置信度不超过 SINGLE_FEATURE_MAX_CONFIDENCE（单个字词可能只是巧合）
+
+没有任何区分特征的汉字文本按国语处理，置信度随汉字数量增加（较长的文本中没有
+粤语口语特征更可能是国语），但不超过 FALLBACK_MAX_CONFIDENCE：粤语歌的歌名也多用书面语，
+这类文本在默认阈值下仍由LLM识别语言
+"""
+
+import re
+from typing import Dict, Tuple
+
+# 粤语口语特有的字（书面国语中基本不用；喇、咪、靓、俾等国语中也常见的字不收录）
+_CANTONESE_CHARS = "嘅咗唔冇嘢佢哋喺啲嚟乜咁嗰噉睇嘥攰揾搵啱喎㗎嘞囉噃嘍嚿餸瞓攞嬲諗谂孭冚撚"
+# 粤语常用词（单字在国语中也常见，组合起来才有区分度）
+_CANTONESE_WORDS = (
+    "係咪 系咪 點解 点解 點樣 点样 邊個 边个 邊度 边度 乜嘢 咩嘢 唔該 唔该 唔好 唔係 唔系 "
+    "琴日 聽日 听日 而家 宜家 鍾意 钟意 好耐 返屋企 屋企 老豆 老母 細佬 细佬 "
+    "傾偈 倾偈 識得 识得 搞掂 好彩 唔理 冇得 冇人 做乜 有冇 係咁 系咁 咁樣 咁样 "
+    "幾多 几多 嗰度 呢度 呢個 呢个 嗰個 嗰个"
+).split()
+# 国语口语特有的字和词（粤语口语通常用其它说法）
+_MANDARIN_CHARS = "们們这這那哪吗嗎啥咱俺甭"
+_MANDARIN_WORDS = (
+    "什么 什麼 怎么 怎麼 为什么 為什麼 没有 沒有 不要 不是 我们 你们 他们 她们 咱们 "
+    "这样 那样 这么 那么 哪里 哪儿 一点儿 一会儿 明儿 今儿 昨儿 东西 喜欢 知道 现在 今天 明天 昨天"
+).split()
+
+LANGUAGE_MANDARIN = "国语"
+LANGUAGE_CANTONESE = "粤语"
+LANGUAGE_ENGLISH = "英语"
+
+# 没有区分特征的汉字文本（按国语处理）的置信度范围
+FALLBACK_BASE_CONFIDENCE = 0.4
+FALLBACK_MAX_CONFIDENCE = 0.7
+# 只出现一种区分特征时的置信度上限，低于默认阈值，单个字词不足以跳过LLM的语言识别
+SINGLE_FEATURE_MAX_CONFIDENCE = 0.75
+
+
+def _build_table() -> Dict[str, Tuple[str, float]]:
+    """构建 n-gram -> (语言, 权重) 表，词语的权重高于单字"""
+    table = {}
+    for char in _MANDARIN_CHARS:
+        table[char] = (LANGUAGE_MANDARIN, 1.0)
+    for word in _MANDARIN_WORDS:
+        table[word] = (LANGUAGE_MANDARIN, 1.5)
+    for char in _CANTONESE_CHARS:
+        table[char] = (LANGUAGE_CANTONESE, 2.0)
+    for word in _CANTONESE_WORDS:
+        table[word] = (LANGUAGE_CANTONESE, 2.0)
+    return table
+
+
+_NGRAM_TABLE = _build_table()
+_MAX_NGRAM = max(len(ngram) for ngram in _NGRAM_TABLE)
+
+_HAN_PATTERN = re.compile(r'[㐀-鿿豈-﫿]')
+_LATIN_PATTERN = re.compile(r'[A-Za-z]')
+# 分类器不支持的文字：假名、谚文、西里尔字母，含有这些文字时不判断语言
+_OTHER_SCRIPT_PATTERN = re.compile(r'[\u3040-\u30ff\u31f0-\u31ff\u1100-\u11ff\u3130-\u318f\uac00-\ud7af\u0400-\u04ff]')
+# 不影响语言判断的内容：序号前缀、方括号中的修饰信息
+_NOISE_PATTERN = re.compile(r'^\s*\d+\s*[-_.、．]\s*|[\[【][^\]】]*[\]】]')
+
+
+def classify_language(text: str) -> Tuple[str, float]:
+    """
+    判断文本（文件名、歌手名或歌曲名）的语言
+
+    Args:
+        text: 待判断的文本
+
+    Returns:
+        Tuple[str, float]: (语言, 置信度 0-1)，无法判断时语言为空字符串、置信度为0
+    """
+    text = _NOISE_PATTERN.sub(' ', text)
+    if _OTHER_SCRIPT_PATTERN.search(text):
+        return "", 0.0
+    han_count = len(_HAN_PATTERN.findall(text))
+    latin_count = len(_LATIN_PATTERN.findall(text))
+
+    if han_count == 0:
+        if latin_count >= 2:
+            # 只有拉丁字母：字母越多越可靠
+            return LANGUAGE_ENGLISH, round(min(0.97, 0.8 + 0.02 * latin_count), 2)
+        return "", 0.0
+
+    scores = {LANGUAGE_MANDARIN: 0.0, LANGUAGE_CANTONESE: 0.0}
+    features = {LANGUAGE_MANDARIN: set(), LANGUAGE_CANTONESE: set()}
+    for size in range(1, _MAX_NGRAM + 1):
+        for start in range(len(text) - size + 1):
+            ngram = text[start:start + size]
+            entry = _NGRAM_TABLE.get(ngram)
+            if entry is not None:
+                scores[entry[0]] += entry[1]
+                features[entry[0]].add(ngram)
+
+    cantonese, mandarin = scores[LANGUAGE_CANTONESE], scores[LANGUAGE_MANDARIN]
+    if cantonese > mandarin:
+        language, confidence = LANGUAGE_CANTONESE, min(0.97, 0.7 + 0.1 * (cantonese - mandarin))
+    elif mandarin > cantonese:
+        language, confidence = LANGUAGE_MANDARIN, min(0.9, 0.6 + 0.1 * (mandarin - cantonese))
+    else:
+        language = ""
+    if language:
+        # 至少需要两种不同的特征才能达到默认阈值（词语中的单字不单独计算）
+        found = features[language]
+        if sum(1 for ngram in found if not any(ngram != other and ngram in other for other in found)) < 2:
+            confidence = min(confidence, SINGLE_FEATURE_MAX_CONFIDENCE)
+        return language, round(confidence, 2)
+
+    # 没有区分特征（或两种特征相当）：按国语处理，汉字越多置信度越高，但始终低于区分特征给出的置信度
+    return LANGUAGE_MANDARIN, round(min(FALLBACK_MAX_CONFIDENCE, FALLBACK_BASE_CONFIDENCE + 0.03 * han_count), 2)
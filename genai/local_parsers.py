@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+本地文件名解析器
+在请求LLM之前用预编译的正则表达式解析常见的文件名格式，
+每个解析器给出置信度，只有没有解析器达到置信度阈值的文件名才交给LLM
+
+"歌手 - 歌名" 和 "歌名 - 歌手" 都很常见，仅凭连字符无法判断哪一侧是歌手，
+这类解析器的置信度低于默认阈值，需要歌手词典或文件标签确认歌手所在的一侧；
+没有歌手信息的解析结果不会跳过LLM
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Tuple
+
+
+@dataclass
+class ParseResult:
+    """本地解析结果"""
+    artist: str
+    song_name: str
+    confidence: float
+    parser: str  # 解析器名称
+    language: str = ""  # 国语/粤语/英语，文件名中没有语言信息时为空
+
+
+# 文件名中常见的修饰信息：音质、来源、版本等，出现在括号中时不是歌手名
+NOISE_KEYWORDS = (
+    'live', 'remix', 'mix', 'cover', 'version', 'edit', 'demo', 'inst', 'instrumental', 'karaoke',
+    'acoustic', 'remaster', 'remastered', 'mv', 'hq', 'sq', 'hi-res', 'flac', 'mp3', 'ape', 'wav',
+    'kbps', '320k', '128k', 'feat', 'ft.',
+    '伴奏', '纯音乐', '现场', '演唱会', '版', '无损', '高品质', '原声', '电视剧', '电影', '主题曲',
+    '插曲', '片尾曲', '片头曲', '翻唱', '铃声', '试听', '剪辑', '混音', '重制', '独唱', '合唱'
+)
+
+# 英文关键词按完整单词匹配，避免误伤 Meredith 这类歌手名
+_NOISE_PATTERN = re.compile('|'.join(
+    rf'(?<![a-z]){re.escape(keyword)}(?![a-z])' if keyword.isascii() else re.escape(keyword)
+    for keyword in NOISE_KEYWORDS
+), re.IGNORECASE)
+
+# 解析前去除的内容：序号前缀、方括号中的音质等标记
+_NUMBER_PREFIX = re.compile(r'^\s*\d{1,3}\s*[-_.、．]\s*|^\s*0\d{1,2}\s+')
+_NOISE_BRACKETS = re.compile(r'\s*[\[【](?P<content>[^\]】]*)[\]】]\s*')
+_LANGUAGE_MARKS = {'国语': '国语', '粤语': '粤语', '英语': '英语', '英文': '英语', '普通话': '国语', '广东话': '粤语'}
+
+
+def _clean(text: str) -> str:
+    return ' '.join(text.strip(' _-–—.').split())
+
+
+def _is_noise(text: str) -> bool:
+    return bool(_NOISE_PATTERN.search(text))
+
+
+class LocalParser:
+    """
+    基于单个正则表达式的解析器
+
+    正则表达式需要包含 song 命名组，可选 artist 命名组。
+    子类可以重写 score 调整置信度，返回 0 表示不处理该文件名。
+    """
+
+    def __init__(self, name: str, pattern: str, confidence: float, raw: bool = False, flags: int = 0):
+        """
+        Args:
+            name: 解析器名称
+            pattern: 正则表达式（预先编译）
+            confidence: 匹配成功时的基础置信度
+            raw: 是否解析只去除了序号前缀的文件名（默认解析同时去除了方括号修饰信息的文件名）
+        """
+        self.name = name
+        self.pattern: Pattern = re.compile(pattern, flags)
+        self.confidence = confidence
+        self.raw = raw
+
+    def parse(self, text: str) -> Optional[ParseResult]:
+        """解析去除了修饰信息的文件名，无法解析时返回None；没有歌手信息时歌手为"未知"。"""
+        match = self.pattern.match(text)
+        if not match:
+            return None
+
+        groups = match.groupdict()
+        artist = _clean(groups.get('artist') or '')
+        song_name = _clean(groups.get('song') or '')
+        if not song_name:
+            return None
+
+        confidence = self.score(artist, song_name)
+        if confidence <= 0:
+            return None
+        return ParseResult(artist or "未知", song_name, confidence, self.name)
+
+    def score(self, artist: str, song_name: str) -> float:
+        """根据解析出的内容调整置信度"""
+        confidence = self.confidence
+        if artist:
+            if _is_noise(artist) or artist.isdigit():
+                return 0.0
+            # 歌手名通常较短
+            if len(artist) > 30:
+                confidence -= 0.2
+        if song_name.isdigit():
+            return 0.0
+        return confidence
+
+
+class BracketArtistParser(LocalParser):
+    """歌名 (歌手)：括号中常常是版本信息，需要排除"""
+
+    def score(self, artist: str, song_name: str) -> float:
+        if _is_noise(artist):
+            return 0.0
+        return super().score(artist, song_name)
+
+
+# 默认解析器，按从具体到宽泛的顺序排列
+DEFAULT_PARSERS: List[LocalParser] = [
+    # 歌手《歌名》 / 歌手 - 《歌名》
+    LocalParser('book_title', r'^(?P<artist>[^《》]+?)\s*[-–—:：]?\s*《(?P<song>[^《》]+)》\s*$', 0.85),
+    # 《歌名》 - 歌手
+    LocalParser('book_title_reversed', r'^《(?P<song>[^《》]+)》\s*[-–—:：]?\s*(?P<artist>[^《》]+?)\s*$', 0.8),
+    # 歌手 - 歌名（连字符两侧有空格，只能有一处）；也可能是 歌名 - 歌手，需要确认歌手所在的一侧。
+    # 两侧内部可以有不带空格的连字符（A-ha - Take On Me）
+    LocalParser('spaced_dash', r'^(?P<artist>(?:(?!\s[-–—]\s).)+?)\s+[-–—]\s+(?P<song>(?:(?!\s[-–—]\s).)+)$', 0.5),
+    # 歌名 (歌手) / 歌名（歌手）
+    BracketArtistParser('bracket_artist', r'^(?P<song>[^()（）]+?)\s*[(（](?P<artist>[^()（）]+)[)）]$', 0.6),
+    # 歌手-歌名（无空格，歌手名或歌名本身可能含连字符，置信度较低）
+    LocalParser('plain_dash', r'^(?P<artist>[^-–—\s][^-–—]*?)[-–—](?P<song>[^-–—]+)$', 0.35),
+    # [专辑] 01. 歌名：专辑曲目格式，没有歌手信息
+    LocalParser('album_track', r'^\s*[\[【][^\]】]+[\]】]\s*\d{1,3}\s*[-_.、．]?\s*(?P<song>[^-–—\[【]+?)\s*$', 0.5, raw=True),
+    # 只有歌名，没有歌手信息
+    LocalParser('song_only', r'^(?P<song>[^-–—()（）《》]+)$', 0.3),
+]
+
+
+class LocalParserChain:
+    """按顺序运行多个本地解析器，取置信度最高的结果"""
+
+    def __init__(self, parsers: Optional[List[LocalParser]] = None):
+        self.parsers = list(DEFAULT_PARSERS if parsers is None else parsers)
+
+    def register(self, parser: LocalParser, first: bool = False):
+        """
+        注册解析器
+
+        Args:
+            parser: 解析器
+            first: 是否放在最前面（置信度相同时优先使用）
+        """
+        if first:
+            self.parsers.insert(0, parser)
+        else:
+            self.parsers.append(parser)
+
+    def parse(self, stem: str) -> Optional[ParseResult]:
+        """
+        解析文件名（不含扩展名）
+
+        Returns:
+            Optional[ParseResult]: 置信度最高的结果，没有解析器能处理时返回None
+        """
+        text, language = self.preprocess(stem)
+        if not text:
+            return None
+
+        raw_text = _NUMBER_PREFIX.sub('', stem.strip())
+        best = None
+        for parser in self.parsers:
+            result = parser.parse(raw_text if parser.raw else text)
+            if result is not None and (best is None or result.confidence > best.confidence):
+                best = result
+
+        if best is not None:
+            best.language = language
+        return best
+
+    @staticmethod
+    def preprocess(stem: str) -> Tuple[str, str]:
+        """
+        去除序号前缀和方括号中的修饰信息，并提取方括号中的语言标记
+
+        Returns:
+            Tuple[str, str]: (清理后的文件名, 语言)
+        """
+        language = ""
+
+        def strip_bracket(match) -> str:
+            nonlocal language
+            content = match.group('content').strip()
+            if content in _LANGUAGE_MARKS:
+                language = _LANGUAGE_MARKS[content]
+            return ' '
+
+        text = _NOISE_BRACKETS.sub(strip_bracket, stem)
+        text = _NUMBER_PREFIX.sub('', text.strip())
+        return _clean(text), language
@@ -5,6 +5,7 @@ Ollama LLM提供者
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict
 from .base import LLMProvider
 
@@ -32,30 +33,28 @@ class OllamaProvider(LLMProvider):
             "Content-Type": "application/json"
         })
         
-    def is_available(self) -> bool:
-        """检查Ollama服务是否可用"""
+        # 连接池大小与并发数一致，避免并发请求时反复建立连接
+        pool_size = self._get_max_concurrency()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+    def _check_availability(self) -> bool:
+        """检查Ollama服务是否运行，以及模型是否已下载（只读取模型列表，不加载模型）"""
         try:
-            # 检查Ollama服务是否运行
             response = self.session.get(f"{self.api_base}/api/tags", timeout=5)
             if response.status_code != 200:
                 return False
                 
-            # 检查模型是否可用
-            response = self.session.post(
-                f"{self.api_base}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": "test",
-                    "stream": False,
-                    "options": {"num_predict": 1}
-                },
-                timeout=10
-            )
-            return response.status_code == 200
+            models = {model.get("name", "") for model in response.json().get("models", [])}
+            
+            # 未指定标签的模型名称对应 latest 标签
+            model_name = self.model if ":" in self.model else f"{self.model}:latest"
+            return self.model in models or model_name in models
         except Exception:
             return False
             
-    def _make_llm_request(self, prompt: str) -> str:
+    def _make_llm_request(self, prompt: str, max_tokens: int = 200) -> str:
         """向Ollama发送请求并获取响应"""
         response = self.session.post(
             f"{self.api_base}/api/generate",
@@ -65,7 +64,7 @@ class OllamaProvider(LLMProvider):
                 "stream": False,
                 "options": {
                     "temperature": 0.3,
-                    "num_predict": 200,
+                    "num_predict": max_tokens,
                     "top_p": 0.9
                 }
             },
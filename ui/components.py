@@ -4,9 +4,10 @@ UI组件类
 包含各种UI组件的创建和管理
 """
 
+import time
 import customtkinter as ctk
 import tkinter as tk
-from typing import List, Dict
+from typing import List, Dict, Optional
 from utils.formatters import format_file_size, format_time, format_status
 
 
@@ -95,9 +96,16 @@ class StatusCards:
 class FileList:
     """文件列表组件"""
     
+    # 每批行操作占用主线程的时间上限（秒），超过后把剩余操作安排到下一批
+    RENDER_TIME_BUDGET = 0.008
+    # 每次 delete 调用删除的行数
+    DELETE_BATCH_SIZE = 100
+    
     def __init__(self, parent):
         self.parent = parent
         self.treeview = None
+        self._rows = {}  # 行ID -> 当前显示的内容
+        self._render_job = None
         
     def create_file_list(self):
         """创建文件列表"""
@@ -139,29 +147,107 @@ class FileList:
         return files_frame
         
     def update_file_list(self, files: List[Dict]):
-        """更新文件列表"""
-        # 清空现有数据
-        for item in self.treeview.get_children():
-            self.treeview.delete(item)
-        
-        # 添加新数据
-        for idx, file_info in enumerate(files, 1):
-            # 获取去除前缀的文件名（不含扩展名）
-            original_name = file_info['original_name']
-            clean_name = self._get_display_filename(original_name)
+        """
+        更新文件列表
+        
+        以原文件名作为稳定的行ID，只对新增、删除、内容变化和顺序变化的行进行操作，
+        并通过 after() 分批执行，每批不超过 RENDER_TIME_BUDGET，避免大量文件时阻塞界面。
+        """
+        # 取消尚未完成的上一次更新，从当前实际显示的状态继续
+        if self._render_job is not None:
+            self.treeview.after_cancel(self._render_job)
+            self._render_job = None
+        
+        target_ids = [file_info['original_name'] for file_info in files]
+        target_set = set(target_ids)
+        removed_ids = [iid for iid in self._rows if iid not in target_set]
+        
+        self._render_chunk(files, target_ids, removed_ids, 0, None)
+    
+    def _render_chunk(self, files: List[Dict], target_ids: List[str], removed_ids: List[str],
+                      start: int, move_start: Optional[int]):
+        """在时间预算内执行一批行操作，未完成时安排下一批"""
+        deadline = time.perf_counter() + self.RENDER_TIME_BUDGET
+        
+        # 第一步：删除已不存在的行
+        while removed_ids:
+            chunk = removed_ids[-self.DELETE_BATCH_SIZE:]
+            del removed_ids[-self.DELETE_BATCH_SIZE:]
+            self.treeview.delete(*chunk)
+            for iid in chunk:
+                del self._rows[iid]
+            if removed_ids and time.perf_counter() > deadline:
+                self._schedule_render(files, target_ids, removed_ids, start, move_start)
+                return
+        
+        # 第二步：插入新行、更新内容变化的行
+        while start < len(files):
+            file_info = files[start]
+            iid = target_ids[start]
+            values = self._get_row_values(start + 1, file_info)
             
-            # 获取LLM建议的文件名
-            llm_suggestion = self._get_llm_suggestion(file_info)
+            current = self._rows.get(iid)
+            if current is None:
+                self.treeview.insert("", "end", iid=iid, values=values)
+            elif current != values:
+                self.treeview.item(iid, values=values)
+            self._rows[iid] = values
+            start += 1
             
-            values = (
-                str(idx),
-                llm_suggestion,
-                clean_name,
-                format_status(file_info['status']),
-                format_file_size(file_info['size'])
+            if start < len(files) and time.perf_counter() > deadline:
+                self._schedule_render(files, target_ids, removed_ids, start, move_start)
+                return
+        
+        # 第三步：顺序变化时从第一个不一致的位置开始逐行移动到目标位置，顺序不变时不做任何操作
+        if move_start is None:
+            children = self.treeview.get_children()
+            move_start = next(
+                (i for i, (iid, child) in enumerate(zip(target_ids, children)) if iid != child),
+                len(target_ids)
             )
+        while move_start < len(target_ids):
+            # 前 move_start 行已经是目标顺序，移动后前 move_start+1 行也是
+            self.treeview.move(target_ids[move_start], "", move_start)
+            move_start += 1
+            if move_start < len(target_ids) and time.perf_counter() > deadline:
+                self._schedule_render(files, target_ids, removed_ids, start, move_start)
+                return
+        self._render_job = None
+    
+    def _schedule_render(self, files: List[Dict], target_ids: List[str], removed_ids: List[str],
+                         start: int, move_start: Optional[int]):
+        """安排下一批行操作"""
+        self._render_job = self.treeview.after(
+            1, lambda: self._render_chunk(files, target_ids, removed_ids, start, move_start)
+        )
+    
+    def _get_row_values(self, idx: int, file_info: Dict) -> tuple:
+        """生成某一行的显示内容"""
+        # 获取去除前缀的文件名（不含扩展名）
+        clean_name = self._get_display_filename(file_info['original_name'])
+        
+        # 获取LLM建议的文件名
+        llm_suggestion = self._get_llm_suggestion(file_info)
+        
+        return (
+            str(idx),
+            llm_suggestion,
+            clean_name,
+            format_status(file_info['status']),
+            format_file_size(file_info['size'])
+        )
+    
+    def update_llm_suggestion(self, file_info: Dict):
+        """单独更新某个文件的LLM建议列"""
+        iid = file_info['original_name']
+        values = self._rows.get(iid)
+        if values is None:
+            return
             
-            self.treeview.insert("", "end", values=values)
+        llm_suggestion = self._get_llm_suggestion(file_info)
+        if values[1] != llm_suggestion:
+            self._rows[iid] = (values[0], llm_suggestion) + values[2:]
+            self.treeview.set(iid, "LLM建议", llm_suggestion)
     
     def _get_display_filename(self, filename: str) -> str:
         """获取用于显示的文件名（去除序号前缀和扩展名）"""
@@ -219,10 +305,17 @@ class SortOptions:
         "文件大小 (大到小)"
     ]
     
-    def __init__(self, parent, callback=None):
+    NUMBERING_OPTIONS = [
+        "连续编号",
+        "最少改动"
+    ]
+    
+    def __init__(self, parent, callback=None, numbering_callback=None):
         self.parent = parent
         self.callback = callback
+        self.numbering_callback = numbering_callback
         self.sort_var = None
+        self.numbering_var = None
         
     def create_sort_options(self):
         """创建排序选项"""
@@ -244,8 +337,35 @@ class SortOptions:
         self.sort_var.pack(side="left", padx=(0, 20), pady=10)
         self.sort_var.set(self.SORT_OPTIONS[0])  # 默认选择第一个
         
+        numbering_label = ctk.CTkLabel(
+            sort_frame,
+            text="编号方式:",
+            font=ctk.CTkFont(size=14)
+        )
+        numbering_label.pack(side="left", padx=(20, 10), pady=10)
+        
+        # 最少改动：尽量保留现有编号，只为新文件和顺序冲突的文件分配编号
+        self.numbering_var = ctk.CTkOptionMenu(
+            sort_frame,
+            values=self.NUMBERING_OPTIONS,
+            command=self.numbering_callback
+        )
+        self.numbering_var.pack(side="left", padx=(0, 20), pady=10)
+        self.numbering_var.set(self.NUMBERING_OPTIONS[0])
+        
         return sort_frame
         
+    def set_enabled(self, enabled: bool):
+        """启用或禁用排序和编号选项"""
+        state = "normal" if enabled else "disabled"
+        for option_menu in (self.sort_var, self.numbering_var):
+            if option_menu:
+                option_menu.configure(state=state)
+        
     def get_selected_sort(self) -> str:
         """获取当前选择的排序方式"""
-        return self.sort_var.get() if self.sort_var else self.SORT_OPTIONS[0] 
\ No newline at end of file
+        return self.sort_var.get() if self.sort_var else self.SORT_OPTIONS[0]
+        
+    def get_selected_numbering(self) -> str:
+        """获取当前选择的编号方式"""
+        return self.numbering_var.get() if self.numbering_var else self.NUMBERING_OPTIONS[0] 
\ No newline at end of file
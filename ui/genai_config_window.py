@@ -536,7 +536,7 @@ class GenAIConfigWindow(ctk.CTkToplevel):
             
             # 通知父窗口重新初始化GenAI
             if hasattr(self.parent, 'audio_manager'):
-                self.parent.audio_manager._init_genai()
+                self.parent.audio_manager.reload_genai()
                 
             self.destroy()
             
@@ -4,22 +4,22 @@
 包含应用的主界面逻辑和事件处理
 """
 
+import importlib.util
+import os
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from typing import Dict
+from typing import Dict, List, Optional
 
 from core.audio_manager import AudioFileManager
 from ui.components import StatusCards, FileList, SortOptions
 
-# GenAI相关导入
-try:
-    from ui.genai_config_window import GenAIConfigWindow
-    GENAI_UI_AVAILABLE = True
-except ImportError:
-    GENAI_UI_AVAILABLE = False
-    GenAIConfigWindow = None
+# GenAI配置窗口依赖 requests 和 genai 模块，打开窗口时才导入；这里只检查模块是否存在
+GENAI_UI_AVAILABLE = (
+    importlib.util.find_spec("genai") is not None and
+    importlib.util.find_spec("requests") is not None
+)
 
 
 class MusicManagerMainWindow(ctk.CTk):
@@ -36,6 +36,7 @@ class MusicManagerMainWindow(ctk.CTk):
         self.path_entry = None
         self.analyze_button = None
         self.rename_button = None
+        self.undo_button = None
         self.status_cards = None
         self.file_list = None
         self.sort_options = None
@@ -55,6 +56,13 @@ class MusicManagerMainWindow(ctk.CTk):
         # 设置窗口图标（如果有的话）
         # self.iconbitmap("icon.ico")
         
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+    def on_closing(self):
+        """关闭窗口前提交LLM结果缓存"""
+        self.audio_manager.close()
+        self.destroy()
+        
     def create_widgets(self):
         """创建所有UI组件"""
         # 标题
@@ -64,7 +72,9 @@ class MusicManagerMainWindow(ctk.CTk):
         self._create_folder_selection()
         
         # 排序选项
-        self.sort_options = SortOptions(self, callback=self.on_sort_changed)
+        self.sort_options = SortOptions(
+            self, callback=self.on_sort_changed, numbering_callback=self.on_numbering_changed
+        )
         self.sort_options.create_sort_options()
         
         # 操作按钮（放在排序选项后面）
@@ -159,6 +169,17 @@ class MusicManagerMainWindow(ctk.CTk):
         )
         self.rename_button.pack(side="left", padx=(15, 10), pady=10)
         
+        self.undo_button = ctk.CTkButton(
+            button_container,
+            text="撤销重命名",
+            command=self.undo_rename,
+            width=110,
+            height=40,
+            font=ctk.CTkFont(size=14),
+            state="disabled"
+        )
+        self.undo_button.pack(side="left", padx=(10, 10), pady=10)
+        
         # GenAI配置按钮
         if GENAI_UI_AVAILABLE:
             self.genai_config_button = ctk.CTkButton(
@@ -211,7 +232,6 @@ class MusicManagerMainWindow(ctk.CTk):
         """
         self.progress_bar.set(progress / 100.0)
         self.progress_label.configure(text=message)
-        self.update_idletasks()  # 强制更新UI
         
     def _create_genai_status(self):
         """创建GenAI状态显示"""
@@ -226,13 +246,29 @@ class MusicManagerMainWindow(ctk.CTk):
         )
         self.genai_status_label.pack(pady=8)
         
-        # 初始更新状态
-        self.update_genai_status()
+        # 窗口显示后再检查状态（在后台线程中检查，GenAI模块也在那时才加载）
+        self.after_idle(self.update_genai_status)
         
-    def update_genai_status(self):
+    def update_genai_status(self, use_cache: bool = True):
+        """在后台线程中检查GenAI状态，完成后更新状态显示"""
+        if not hasattr(self.audio_manager, 'get_genai_status'):
+            self._apply_genai_status(None)
+            return
+            
+        self.genai_status_label.configure(text="GenAI状态: 检查中...", text_color="gray")
+        
+        def check_thread():
+            try:
+                status_info = self.audio_manager.get_genai_status(use_cache)
+            except Exception as e:
+                status_info = {"status": "error", "message": f"检查服务状态时出错: {str(e)}"}
+            self.after(0, lambda: self._apply_genai_status(status_info))
+            
+        threading.Thread(target=check_thread, daemon=True).start()
+        
+    def _apply_genai_status(self, status_info: Optional[Dict]):
         """更新GenAI状态显示"""
-        if hasattr(self.audio_manager, 'get_genai_status'):
-            status_info = self.audio_manager.get_genai_status()
+        if status_info is not None:
             status = status_info.get("status", "unknown")
             message = status_info.get("message", "未知状态")
             provider = status_info.get("provider", "")
@@ -270,10 +306,11 @@ class MusicManagerMainWindow(ctk.CTk):
     def open_genai_config(self):
         """打开GenAI配置窗口"""
         if GENAI_UI_AVAILABLE:
+            from ui.genai_config_window import GenAIConfigWindow
             config_window = GenAIConfigWindow(self)
-            # 配置窗口关闭后更新状态
+            # 配置窗口关闭后重新检查服务状态，不使用配置修改前缓存的结果
             self.wait_window(config_window)
-            self.update_genai_status()
+            self.update_genai_status(use_cache=False)
         
     def browse_folder(self):
         """浏览文件夹"""
@@ -286,7 +323,29 @@ class MusicManagerMainWindow(ctk.CTk):
             
     def on_sort_changed(self, value):
         """排序方式改变时的回调"""
-        if self.path_entry.get().strip():
+        folder_path = self.path_entry.get().strip()
+        if not folder_path:
+            return
+            
+        # 已有当前文件夹的分析结果时直接重新排序，不重新扫描也不重新调用LLM
+        if self.current_analysis and self.current_analysis['folder_path'] == folder_path:
+            analysis = self.audio_manager.resort_analysis(self.current_analysis, value)
+            self.update_analysis_results_silent(analysis)
+        else:
+            self.refresh_analysis()
+            
+    def on_numbering_changed(self, value):
+        """编号方式改变时的回调"""
+        folder_path = self.path_entry.get().strip()
+        if not folder_path:
+            return
+            
+        if self.current_analysis and self.current_analysis['folder_path'] == folder_path:
+            analysis = self.audio_manager.resort_analysis(
+                self.current_analysis, self.current_analysis['sort_method'], value
+            )
+            self.update_analysis_results_silent(analysis)
+        else:
             self.refresh_analysis()
             
     def analyze_folder(self):
@@ -296,9 +355,21 @@ class MusicManagerMainWindow(ctk.CTk):
             messagebox.showwarning("警告", "请先选择一个文件夹")
             return
             
+        # 上次重命名被中断时，先询问是否恢复原文件名
+        if os.path.isdir(folder_path) and self.audio_manager.has_interrupted_rename(folder_path):
+            if messagebox.askyesno(
+                "发现未完成的重命名",
+                "该文件夹上次的重命名没有完成，是否把文件恢复为重命名前的名称？"
+            ):
+                self.undo_rename()
+                return
+            
         # 禁用按钮并显示进度条
         self.analyze_button.configure(state="disabled", text="分析中...")
         self.rename_button.configure(state="disabled")
+        self.undo_button.configure(state="disabled")
+        # 分析完成前只有部分结果，暂不允许重新排序
+        self.sort_options.set_enabled(False)
         self.show_progress()
         
         def progress_callback(progress, message):
@@ -308,14 +379,29 @@ class MusicManagerMainWindow(ctk.CTk):
         def analyze_thread():
             try:
                 sort_method = self.sort_options.get_selected_sort()
-                analysis = self.audio_manager.analyze_files(folder_path, sort_method, progress_callback)
-                # 在主线程中更新UI
-                self.after(0, lambda: self.update_analysis_results(analysis))
+                numbering = self.sort_options.get_selected_numbering()
+                # 分阶段获取结果：先显示扫描结果，再逐个填入GenAI建议
+                for event, payload in self.audio_manager.iter_analyze_files(
+                    folder_path, sort_method, progress_callback, numbering
+                ):
+                    # 在主线程中更新UI
+                    if event == 'scanned':
+                        files = list(payload['files'])
+                        self.after(0, lambda a=payload, f=files: self.show_partial_results(a, f))
+                    elif event == 'genai':
+                        self.after(0, lambda f=payload: self.file_list.update_llm_suggestion(f))
+                    elif event == 'done':
+                        self.after(0, lambda a=payload: self.update_analysis_results(a))
             except Exception as e:
                 self.after(0, lambda: self.show_analysis_error(str(e)))
                 
         threading.Thread(target=analyze_thread, daemon=True).start()
         
+    def show_partial_results(self, analysis: Dict, files: List[Dict]):
+        """显示尚未包含GenAI结果的扫描结果"""
+        self.status_cards.update_status(analysis)
+        self.file_list.update_file_list(files)
+        
     def update_analysis_results(self, analysis: Dict):
         """更新分析结果"""
         self.current_analysis = analysis
@@ -331,12 +417,21 @@ class MusicManagerMainWindow(ctk.CTk):
         
         # 恢复按钮状态
         self.analyze_button.configure(state="normal", text="分析文件夹")
+        self.sort_options.set_enabled(True)
         
         # 根据需要重命名的文件数量决定是否启用重命名按钮
         if analysis['needs_rename_count'] > 0:
             self.rename_button.configure(state="normal")
         else:
             self.rename_button.configure(state="disabled")
+        self._update_undo_button(analysis['folder_path'])
+            
+    def _update_undo_button(self, folder_path: str):
+        """根据文件夹中是否有重命名日志决定是否启用撤销按钮"""
+        if self.audio_manager.can_undo_rename(folder_path):
+            self.undo_button.configure(state="normal")
+        else:
+            self.undo_button.configure(state="disabled")
             
     def show_analysis_error(self, error_msg: str):
         """显示分析错误"""
@@ -344,6 +439,7 @@ class MusicManagerMainWindow(ctk.CTk):
         self.hide_progress()
         
         self.analyze_button.configure(state="normal", text="分析文件夹")
+        self.sort_options.set_enabled(True)
         messagebox.showerror("错误", f"分析文件夹时出错：{error_msg}")
         
     def rename_files(self):
@@ -353,10 +449,7 @@ class MusicManagerMainWindow(ctk.CTk):
             return
             
         # 检查是否有文件需要重命名
-        file_mappings = {}
-        for file_info in self.current_analysis['files']:
-            if file_info['original_name'] != file_info['suggested_name']:
-                file_mappings[file_info['original_name']] = file_info['suggested_name']
+        file_mappings = self.audio_manager.get_rename_mappings(self.current_analysis)
                 
         if not file_mappings:
             messagebox.showinfo("信息", "没有文件需要重命名")
@@ -373,6 +466,7 @@ class MusicManagerMainWindow(ctk.CTk):
         # 禁用按钮并显示进度条
         self.rename_button.configure(state="disabled", text="重命名中...")
         self.analyze_button.configure(state="disabled")
+        self.undo_button.configure(state="disabled")
         self.show_progress()
         
         def progress_callback(progress, message):
@@ -409,6 +503,48 @@ class MusicManagerMainWindow(ctk.CTk):
         # 重新分析文件夹
         self.refresh_analysis()
         
+    def undo_rename(self):
+        """撤销上一次重命名，或回滚被中断的重命名"""
+        folder_path = self.path_entry.get().strip()
+        if not folder_path:
+            return
+            
+        # 禁用按钮并显示进度条
+        self.undo_button.configure(state="disabled", text="撤销中...")
+        self.rename_button.configure(state="disabled")
+        self.analyze_button.configure(state="disabled")
+        self.show_progress()
+        
+        def progress_callback(progress, message):
+            """撤销进度回调函数"""
+            self.after(0, lambda: self.update_progress(progress, message))
+        
+        def undo_thread():
+            try:
+                success_count, errors = self.audio_manager.undo_last_rename(folder_path, progress_callback)
+                self.after(0, lambda: self.show_undo_results(success_count, errors))
+            except Exception as e:
+                self.after(0, lambda: self.show_rename_error(str(e)))
+                
+        threading.Thread(target=undo_thread, daemon=True).start()
+        
+    def show_undo_results(self, success_count: int, errors: list):
+        """显示撤销结果"""
+        # 隐藏进度条
+        self.hide_progress()
+        
+        self.undo_button.configure(text="撤销重命名")
+        self.analyze_button.configure(state="normal")
+        
+        if errors:
+            error_msg = f"成功还原 {success_count} 个文件\n\n出现以下错误：\n" + "\n".join(errors)
+            messagebox.showwarning("撤销完成", error_msg)
+        else:
+            messagebox.showinfo("撤销完成", f"成功还原 {success_count} 个文件")
+            
+        # 重新分析文件夹
+        self.refresh_analysis()
+        
     def refresh_analysis(self):
         """刷新分析结果"""
         folder_path = self.path_entry.get().strip()
@@ -418,7 +554,8 @@ class MusicManagerMainWindow(ctk.CTk):
         def analyze_thread():
             try:
                 sort_method = self.sort_options.get_selected_sort()
-                analysis = self.audio_manager.analyze_files(folder_path, sort_method)
+                numbering = self.sort_options.get_selected_numbering()
+                analysis = self.audio_manager.analyze_files(folder_path, sort_method, numbering=numbering)
                 self.after(0, lambda: self.update_analysis_results_silent(analysis))
             except Exception as e:
                 # 静默处理错误，不显示错误对话框
@@ -441,6 +578,7 @@ class MusicManagerMainWindow(ctk.CTk):
             self.rename_button.configure(state="normal")
         else:
             self.rename_button.configure(state="disabled")
+        self._update_undo_button(analysis['folder_path'])
             
     def show_rename_error(self, error_msg: str):
         """显示重命名错误"""
@@ -448,5 +586,6 @@ class MusicManagerMainWindow(ctk.CTk):
         self.hide_progress()
         
         self.rename_button.configure(state="disabled", text="执行重命名")
+        self.undo_button.configure(text="撤销重命名")
         self.analyze_button.configure(state="normal")
         messagebox.showerror("错误", f"重命名文件时出错：{error_msg}") 
\ No newline at end of file
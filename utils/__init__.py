@@ -3,6 +3,7 @@
 工具函数模块
 """
 
-from .formatters import format_file_size, format_time, format_status
+from .formatters import format_file_size, format_time, format_duration, format_status
+from .progress import ProgressAggregator
 
-__all__ = ['format_file_size', 'format_time', 'format_status'] 
\ No newline at end of file
+__all__ = ['format_file_size', 'format_time', 'format_duration', 'format_status', 'ProgressAggregator'] 
\ No newline at end of file
@@ -35,6 +35,20 @@ def format_time(timestamp: float) -> str:
         return "未知"
 
 
+def format_duration(seconds: float) -> str:
+    """格式化时长显示"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}秒"
+    
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}分{seconds:02d}秒"
+    
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}小时{minutes:02d}分"
+
+
 def format_status(status: str) -> str:
     """格式化文件状态显示"""
     status_map = {
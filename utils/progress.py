@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+进度聚合器
+合并高频的进度回调，限制界面更新频率，并在消息中附加处理速度和剩余时间
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from .formatters import format_duration
+
+
+class ProgressAggregator:
+    """限速的进度回调包装器"""
+
+    DEFAULT_INTERVAL = 0.1  # 两次回调之间的最小间隔（秒）
+
+    def __init__(self, callback: Callable[[int, str], None], min_interval: float = DEFAULT_INTERVAL):
+        """
+        初始化进度聚合器
+
+        Args:
+            callback: 实际的进度回调，参数为 (进度百分比, 消息)
+            min_interval: 两次回调之间的最小间隔（秒）
+        """
+        self.callback = callback
+        self.min_interval = min_interval
+
+        # 在锁内调用回调，保证回调顺序与进度顺序一致
+        self._lock = threading.RLock()
+        self._last_emit = 0.0
+        self._pending = None
+        self._timer = None
+
+        # 当前阶段的计数信息，用于计算速度和剩余时间
+        self._stage_total = None
+        self._stage_start = 0.0
+        self._stage_start_done = 0
+        self._last_done = 0
+
+    @classmethod
+    def wrap(cls, callback: Optional[Callable[[int, str], None]], min_interval: float = DEFAULT_INTERVAL):
+        """
+        包装进度回调
+
+        Returns:
+            ProgressAggregator: 包装后的回调；callback 为 None 或已经包装过时原样返回
+        """
+        if callback is None or isinstance(callback, cls):
+            return callback
+        return cls(callback, min_interval)
+
+    def __call__(self, progress: int, message: str, done: Optional[int] = None, total: Optional[int] = None):
+        """
+        报告进度
+
+        Args:
+            progress: 进度百分比 (0-100)
+            message: 进度消息
+            done: 当前阶段已处理的数量（可选）
+            total: 当前阶段的总数量（可选）
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            if done is not None and total:
+                message = self._append_rate(message, done, total, now)
+
+            self._pending = (progress, message)
+
+            # 开始和结束状态总是立即发送
+            if progress <= 0 or progress >= 100 or now - self._last_emit >= self.min_interval:
+                self._emit_pending(now)
+            else:
+                self._schedule_flush(now)
+
+    def flush(self):
+        """立即发送尚未发送的最新进度"""
+        with self._lock:
+            self._emit_pending(time.monotonic())
+
+    def _emit_pending(self, now: float):
+        """发送待发送的进度（调用方需持有锁）"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        state = self._pending
+        self._pending = None
+        if state is not None:
+            self._last_emit = now
+            self.callback(*state)
+
+    def _schedule_flush(self, now: float):
+        """安排稍后发送被合并的进度，确保最新状态最终会被显示（调用方需持有锁）"""
+        if self._timer is not None:
+            return
+        delay = max(0.0, self.min_interval - (now - self._last_emit))
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _append_rate(self, message: str, done: int, total: int, now: float) -> str:
+        """在消息中附加处理速度和剩余时间（调用方需持有锁）"""
+        # 总数变化或计数回退表示进入了新的阶段
+        if total != self._stage_total or done < self._last_done:
+            self._stage_total = total
+            self._stage_start = now
+            self._stage_start_done = done
+        self._last_done = done
+
+        elapsed = now - self._stage_start
+        processed = done - self._stage_start_done
+        if processed <= 0 or elapsed <= 0:
+            return message
+
+        rate = processed / elapsed
+        remaining = max(0, total - done) / rate
+        return f"{message} ({rate:.1f} 个/秒, 剩余约 {format_duration(remaining)})"